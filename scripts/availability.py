@@ -0,0 +1,120 @@
+"""Persistent per-zone index of which delivery days have day-ahead data.
+
+Every fetch and diagnostic probe learns whether a (zone, day) has data. The
+index keeps that knowledge as two bitmaps per zone (one bit per day since
+ORIGIN): "known" marks days whose status has been observed and "has_data"
+marks the ones that returned prices. Known-empty days are skipped when
+planning fetch windows.
+"""
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+ORIGIN = date(2015, 1, 1)
+PERIOD_FORMAT = "%Y%m%d%H%M"
+
+
+def _parse_period(value):
+    return datetime.strptime(value, PERIOD_FORMAT)
+
+
+def _as_date(day):
+    return day.date() if isinstance(day, datetime) else day
+
+
+def period_days(start, end):
+    """Delivery days touched by the ENTSO-E period start..end"""
+    day = _parse_period(start).date()
+    dt_end = _parse_period(end)
+    days = []
+    while datetime.combine(day, datetime.min.time()) < dt_end:
+        days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+class AvailabilityIndex:
+    """Day bitmaps per zone stored as JSON files under index_dir"""
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        self._lock = threading.Lock()
+        self._zones = {}
+
+    def _path(self, zone):
+        return os.path.join(self.index_dir, f"{zone}.json")
+
+    def _bitmaps(self, zone):
+        if zone not in self._zones:
+            try:
+                with open(self._path(zone)) as f:
+                    stored = json.load(f)
+                self._zones[zone] = [int(stored["known"], 16), int(stored["has_data"], 16)]
+            except (OSError, ValueError, KeyError):
+                self._zones[zone] = [0, 0]
+        return self._zones[zone]
+
+    def _save(self, zone):
+        known, has_data = self._zones[zone]
+        os.makedirs(self.index_dir, exist_ok=True)
+        tmp_path = self._path(zone) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"origin": ORIGIN.isoformat(), "known": format(known, "x"),
+                       "has_data": format(has_data, "x")}, f)
+        os.replace(tmp_path, self._path(zone))
+
+    def mark(self, zone, days, has_data):
+        """Record days as having data or not.
+
+        Empty results for today and later are not recorded, since those days
+        may simply not be published yet.
+        """
+        today = datetime.now(timezone.utc).date()
+        with self._lock:
+            bitmaps = self._bitmaps(zone)
+            for day in map(_as_date, days):
+                offset = (day - ORIGIN).days
+                if offset < 0 or (not has_data and day >= today):
+                    continue
+                bitmaps[0] |= 1 << offset
+                if has_data:
+                    bitmaps[1] |= 1 << offset
+                else:
+                    bitmaps[1] &= ~(1 << offset)
+            self._save(zone)
+
+    def mark_period(self, zone, start, end, has_data):
+        """Record every day fully covered by the ENTSO-E period start..end"""
+        dt_start, dt_end = _parse_period(start), _parse_period(end)
+        days = [day for day in period_days(start, end)
+                if datetime.combine(day, datetime.min.time()) >= dt_start
+                and datetime.combine(day + timedelta(days=1), datetime.min.time()) <= dt_end]
+        self.mark(zone, days, has_data)
+
+    def status(self, zone, day):
+        """True/False if the day is known to have data or to be empty, None if unknown"""
+        offset = (_as_date(day) - ORIGIN).days
+        if offset < 0:
+            return None
+        with self._lock:
+            known, has_data = self._bitmaps(zone)
+        if not known >> offset & 1:
+            return None
+        return bool(has_data >> offset & 1)
+
+    def filter_runs(self, zone, runs):
+        """Drop known-empty days from (start, end) runs, splitting them as needed"""
+        filtered = []
+        for start, end in runs:
+            dt_start, dt_end = _parse_period(start), _parse_period(end)
+            for day in period_days(start, end):
+                if self.status(zone, day) is False:
+                    continue
+                day_start = max(datetime.combine(day, datetime.min.time()), dt_start)
+                day_end = min(datetime.combine(day + timedelta(days=1), datetime.min.time()), dt_end)
+                if filtered and filtered[-1][1] == day_start:
+                    filtered[-1] = (filtered[-1][0], day_end)
+                else:
+                    filtered.append((day_start, day_end))
+        return [(s.strftime(PERIOD_FORMAT), e.strftime(PERIOD_FORMAT)) for s, e in filtered]
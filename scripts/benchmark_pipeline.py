@@ -0,0 +1,193 @@
+"""Offline benchmark of the fetch -> parse -> normalize -> align -> save -> plot pipeline.
+
+Synthetic A44 documents are served by an in-process fake transport, so no
+API token or network is needed. Every stage is timed per zone and the run
+reports throughput (points/s), peak RSS and bytes written. The pipeline runs
+in a temporary directory with its own config.json, leaving data/ untouched.
+
+    python scripts/benchmark_pipeline.py --zones 4 --days 365 --resolution 15
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from synthetic_entsoe import a44_document
+
+STAGES = ["generate", "fetch", "parse", "normalize", "align", "save", "plot"]
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+        self.headers = {}
+
+
+class FakeSession:
+    """Stands in for requests.Session, serving pre-generated documents"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.requests = 0
+        self.bytes = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.requests += 1
+        text = self.documents[(params["in_Domain"], params["periodStart"], params["periodEnd"])]
+        self.bytes += len(text)
+        return FakeResponse(text)
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def directory_bytes(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(dirpath, name)) for name in filenames)
+    return total
+
+
+def benchmark_config(args):
+    return {
+        "api_token": "synthetic",
+        "normalize_to_kwh": True,
+        "export_format": args.export_format,
+        "storage_schema": args.storage_schema,
+        "timezone": args.timezone,
+        "make_plots": args.plots,
+        "chunk_size": args.chunk_size,
+        "cache_enabled": False,
+        "availability_index": False,
+        "http_retries": 0,
+    }
+
+
+def run_benchmark(args):
+    # processor reads config.json from the working directory on import
+    workdir = tempfile.mkdtemp(prefix="price_benchmark_")
+    with open(os.path.join(workdir, "config.json"), "w") as f:
+        json.dump(benchmark_config(args), f, indent=2)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+
+    try:
+        import processor
+
+        start_dt = datetime.strptime(args.start, "%Y-%m-%d")
+        start = start_dt.strftime(processor.ENTSOE_DATETIME_FORMAT)
+        end = (start_dt + timedelta(days=args.days)).strftime(processor.ENTSOE_DATETIME_FORMAT)
+        zones = list(processor.ZONE_CODES.values())[:args.zones]
+
+        timings = {stage: 0.0 for stage in STAGES}
+        rss = {}
+        points = 0
+
+        def timed(stage, func, *func_args):
+            began = time.perf_counter()
+            result = func(*func_args)
+            timings[stage] += time.perf_counter() - began
+            rss[stage] = peak_rss_mb()
+            return result
+
+        windows = processor.split_period(start, end, args.chunk_size)
+        documents = timed("generate", lambda: {
+            (zone, *window): a44_document(zone, *window, resolution=args.resolution,
+                                          curve_type=args.curve_type)
+            for zone in zones for window in windows})
+        session = FakeSession(documents)
+
+        for zone in zones:
+            raw = timed("fetch", lambda: [
+                processor.fetch_day_ahead_prices(zone, *window, session=session)
+                for window in windows])
+            df = timed("parse", processor.merge_documents, zone, raw, start, end)
+            df = timed("normalize", processor.normalize_to_kWh, df)
+            df = timed("align", processor.align_timezones, df)
+            timed("save", processor.save_outputs, df, zone, start, end)
+            if args.plots:
+                timed("plot", processor.plot_prices, df, zone)
+            points += len(df)
+
+        return {
+            "zones": len(zones),
+            "days": args.days,
+            "resolution_minutes": args.resolution,
+            "curve_type": args.curve_type,
+            "export_format": args.export_format,
+            "storage_schema": args.storage_schema,
+            "requests": session.requests,
+            "points": points,
+            "bytes_downloaded": session.bytes,
+            "bytes_written": directory_bytes("data"),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": {
+                stage: {
+                    "seconds": round(timings[stage], 4),
+                    "points_per_second": round(points / timings[stage]) if timings[stage] else None,
+                    "peak_rss_mb": rss.get(stage),
+                }
+                for stage in STAGES if stage in rss
+            },
+        }
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def print_report(result):
+    print("=" * 60)
+    print(f"{result['zones']} zones × {result['days']} days at {result['resolution_minutes']} min "
+          f"({result['curve_type']}), {result['points']:,} points, {result['requests']} requests")
+    print("=" * 60)
+    print(f"{'stage':<10} {'seconds':>10} {'points/s':>14} {'peak RSS MB':>12}")
+    for stage, stats in result["stages"].items():
+        rate = f"{stats['points_per_second']:,}" if stats["points_per_second"] else "-"
+        print(f"{stage:<10} {stats['seconds']:>10.3f} {rate:>14} {stats['peak_rss_mb'] or '-':>12}")
+    print("-" * 60)
+    print(f"📥 Downloaded: {result['bytes_downloaded']:,} bytes")
+    print(f"💾 Written: {result['bytes_written']:,} bytes ({result['export_format']}, "
+          f"{result['storage_schema']} schema)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the price pipeline on synthetic data")
+    parser.add_argument("--zones", type=int, default=4, help="number of zones from ZONE_CODES")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--start", default="2024-01-01", help="first day (YYYY-MM-DD, UTC)")
+    parser.add_argument("--resolution", type=int, default=15, choices=[15, 30, 60],
+                        help="minutes per point")
+    parser.add_argument("--curve-type", default="A01", choices=["A01", "A03"])
+    parser.add_argument("--chunk-size", default="month", choices=["day", "week", "month"])
+    parser.add_argument("--export-format", default="csv",
+                        choices=["csv", "parquet", "parquet_dataset"])
+    parser.add_argument("--storage-schema", default="full", choices=["full", "compact"])
+    parser.add_argument("--timezone", default="Europe/Paris")
+    parser.add_argument("--plots", action="store_true", help="include the plot stage")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = run_benchmark(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"✅ Results saved: {args.output}")
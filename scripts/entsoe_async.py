@@ -0,0 +1,79 @@
+"""Asyncio transport for the ENTSO-E API (requires aiohttp).
+
+Many (zone, window) requests are kept in flight on a single event loop. A
+semaphore bounds the number of open requests and a token bucket keeps the
+request rate under the platform quota, so a backfill of hundreds of small
+requests saturates the quota without exceeding it.
+"""
+import asyncio
+import time
+
+import aiohttp
+
+from entsoe_client import (API_URL, DEFAULT_BACKOFF, DEFAULT_RETRIES, DEFAULT_TIMEOUT,
+                           RETRY_STATUS_CODES, retry_delay)
+
+# The Transparency Platform allows 400 requests per minute per user
+ENTSOE_REQUESTS_PER_MINUTE = 400
+
+
+class TokenBucket:
+    """Async token bucket refilled at rate tokens per second"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def entsoe_get_async(session, params, semaphore, bucket, url=API_URL,
+                           timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                           backoff=DEFAULT_BACKOFF):
+    """GET the API and return (status, text), retrying 429/5xx and connection errors"""
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    for attempt in range(retries + 1):
+        retry_after = None
+        await bucket.acquire()
+        try:
+            async with semaphore:
+                async with session.get(url, params=params, timeout=client_timeout) as r:
+                    status = r.status
+                    text = await r.text()
+                    retry_after = r.headers.get("Retry-After")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == retries:
+                raise
+        else:
+            if status not in RETRY_STATUS_CODES or attempt == retries:
+                return status, text
+
+        await asyncio.sleep(retry_delay(attempt, backoff, retry_after))
+
+
+async def fetch_all(params_list, max_concurrency=16,
+                    requests_per_minute=ENTSOE_REQUESTS_PER_MINUTE, **options):
+    """Fetch every query concurrently; results are (status, text) or an exception, in order"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    bucket = TokenBucket(requests_per_minute / 60, capacity=max_concurrency)
+    connector = aiohttp.TCPConnector(limit=max_concurrency)
+
+    async with aiohttp.ClientSession(connector=connector,
+                                     headers={"Accept-Encoding": "gzip, deflate"}) as session:
+        return await asyncio.gather(
+            *(entsoe_get_async(session, params, semaphore, bucket, **options)
+              for params in params_list),
+            return_exceptions=True)
@@ -0,0 +1,101 @@
+"""Shared HTTP client for the ENTSO-E Transparency Platform API.
+
+All scripts go through one pooled keep-alive session with gzip transfer
+encoding, per-request timeouts and exponential backoff with jitter on
+rate-limit (429) and server (5xx) errors.
+"""
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = "https://web-api.tp.entsoe.eu/api"  # override with "api_base_url"
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 60
+
+_default_session = None
+_default_session_lock = threading.Lock()
+
+
+def make_session(pool_size=10):
+    """Create a session with a connection pool of pool_size keep-alive connections"""
+    session = requests.Session()
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def default_session():
+    """Process-wide session used when the caller does not pass one"""
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = make_session()
+        return _default_session
+
+
+def http_options(config):
+    """Base URL, timeout and retry settings from config.json"""
+    return {
+        "url": config.get("api_base_url", API_URL),
+        "timeout": config.get("http_timeout", DEFAULT_TIMEOUT),
+        "retries": config.get("http_retries", DEFAULT_RETRIES),
+        "backoff": config.get("http_backoff", DEFAULT_BACKOFF),
+    }
+
+
+def retry_delay(attempt, backoff, retry_after=None):
+    # Full jitter: a random delay up to the exponential backoff ceiling, but
+    # never shorter than what the server asked for in Retry-After.
+    delay = random.uniform(0, min(MAX_BACKOFF, backoff * 2 ** attempt))
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, min(MAX_BACKOFF, int(retry_after)))
+    return delay
+
+
+def entsoe_get(params, session=None, url=API_URL, timeout=DEFAULT_TIMEOUT,
+               retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, deadline=None):
+    """GET the API, retrying connection errors, 429 and 5xx responses.
+
+    Returns the last response once it is final or retries are exhausted;
+    connection errors on the last attempt are raised. With a deadline
+    (time.monotonic() value) each attempt's timeout is capped at the time left
+    and no retry is scheduled past it; requests.Timeout is raised when the
+    deadline leaves no time for a request.
+    """
+    session = session or default_session()
+
+    for attempt in range(retries + 1):
+        attempt_timeout = timeout
+        if deadline is not None:
+            attempt_timeout = min(timeout, deadline - time.monotonic())
+            if attempt_timeout <= 0:
+                raise requests.Timeout("Deadline passed before the request was sent")
+
+        retry_after = None
+        try:
+            r = session.get(url, params=params, timeout=attempt_timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+            r = None
+        else:
+            if r.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                return r
+            retry_after = r.headers.get("Retry-After")
+
+        delay = retry_delay(attempt, backoff, retry_after)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            # No time left for another attempt
+            if r is None:
+                raise requests.Timeout("Deadline passed while retrying")
+            return r
+        time.sleep(delay)
@@ -1,6 +1,16 @@
-import requests
+import argparse
 import json
-from datetime import datetime, timedelta
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, wait
+from datetime import date, datetime, timedelta
+
+import requests
+
+from availability import AvailabilityIndex
+from entsoe_client import entsoe_get, http_options, make_session
 
 # Zone codes
 ZONE_CODES = {
@@ -20,6 +30,107 @@ with open("config.json") as f:
 
 API_KEY = config.get("api_token", "")
 
+# Every probe reuses the same pooled keep-alive connection
+SESSION = make_session(pool_size=16)
+HTTP_OPTIONS = dict(http_options(config), timeout=config.get("probe_timeout", 10))
+
+# Overall time budget for a batch of concurrent probes, in seconds
+PROBE_DEADLINE = config.get("probe_deadline", 60)
+PROBE_WORKERS = 16
+
+# Deadline (time.monotonic()) of the run_probes batch the current thread works for
+_probe_context = threading.local()
+
+# Results of the newest/oldest day searches, reused across diagnostic runs
+PROBE_CACHE_FILE = os.path.join("data", "probe_cache.json")
+PROBE_CACHE_HOURS = config.get("probe_cache_hours", 6)
+
+# The Transparency Platform has day-ahead prices from 2015 onwards
+EARLIEST_DATA_DAY = date(2015, 1, 1)
+
+# Which (zone, day) pairs are known to have data, shared with processor.py
+AVAILABILITY = (AvailabilityIndex(os.path.join("data", "availability"))
+                if config.get("availability_index", True) else None)
+
+
+def probe_day(zone, day):
+    """Return True if the API has day-ahead prices for zone on day.
+
+    Raises requests.HTTPError when the API still answers with an error after
+    all retries, so a temporary failure is never taken for a day without data.
+    """
+    params = {
+        "securityToken": API_KEY,
+        "documentType": "A44",
+        "in_Domain": zone,
+        "out_Domain": zone,
+        "periodStart": day.strftime("%Y%m%d") + "0000",
+        "periodEnd": (day + timedelta(days=1)).strftime("%Y%m%d") + "0000",
+    }
+    # Inside run_probes, timeouts and retries are capped by the batch deadline
+    deadline = getattr(_probe_context, "deadline", None)
+    r = entsoe_get(params, session=SESSION, deadline=deadline, **HTTP_OPTIONS)
+    if r.status_code != 200:
+        raise requests.HTTPError(f"HTTP {r.status_code} for {day.isoformat()}", response=r)
+
+    has_data = "<Acknowledgement_MarketDocument" not in r.text
+    if AVAILABILITY is not None:
+        AVAILABILITY.mark(zone, [day], has_data)
+    return has_data
+
+
+def probe_day_indexed(zone, day):
+    """probe_day that answers from the availability index when it can"""
+    known = AVAILABILITY.status(zone, day) if AVAILABILITY is not None else None
+    return probe_day(zone, day) if known is None else known
+
+
+def run_probes(probes, deadline=PROBE_DEADLINE):
+    """Run probe callables concurrently and return their outcomes in input order.
+
+    Each outcome is ("ok", value), ("error", exception) or ("timeout", None)
+    for probes not finished when the overall deadline expires.
+    """
+    deadline_at = time.monotonic() + deadline
+    futures = [Future() for _ in probes]
+    pending = queue.SimpleQueue()
+    for item in zip(futures, probes):
+        pending.put(item)
+
+    def worker():
+        _probe_context.deadline = deadline_at
+        while True:
+            try:
+                future, probe = pending.get_nowait()
+            except queue.Empty:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(probe())
+            except Exception as e:
+                future.set_exception(e)
+
+    # Daemon threads: a probe stuck in a call past the deadline must not keep
+    # the process alive at exit, as executor threads would.
+    for _ in range(max(1, min(len(probes), PROBE_WORKERS))):
+        threading.Thread(target=worker, daemon=True).start()
+
+    wait(futures, timeout=deadline)
+    for future in futures:
+        # Probes that have not started yet are skipped
+        future.cancel()
+
+    outcomes = []
+    for future in futures:
+        if not future.done() or future.cancelled():
+            outcomes.append(("timeout", None))
+        elif future.exception() is not None:
+            outcomes.append(("error", future.exception()))
+        else:
+            outcomes.append(("ok", future.result()))
+    return outcomes
+
 
 def test_api_key():
     """Test if API key is valid"""
@@ -27,8 +138,6 @@ def test_api_key():
     print("🔑 TESTING API KEY VALIDITY")
     print("=" * 70)
     
-    url = "https://web-api.tp.entsoe.eu/api"
-    
     # Use a simple query that should work for most zones
     today = datetime.now()
     yesterday = today - timedelta(days=1)
@@ -43,7 +152,7 @@ def test_api_key():
     }
     
     try:
-        r = requests.get(url, params=params, timeout=10)
+        r = entsoe_get(params, session=SESSION, **HTTP_OPTIONS)
         print(f"📡 Status Code: {r.status_code}")
         print(f"🔗 Test URL: {r.url[:100]}...")
         
@@ -72,32 +181,26 @@ def test_multiple_zones():
     
     # Test with a date that should have data (a week ago)
     test_date = datetime.now() - timedelta(days=7)
-    start = test_date.strftime("%Y%m%d") + "0000"
-    end = (test_date + timedelta(days=1)).strftime("%Y%m%d") + "0000"
     
     print(f"📅 Testing date: {test_date.strftime('%Y-%m-%d')}\n")
     
-    url = "https://web-api.tp.entsoe.eu/api"
     results = []
     
-    for country, zone in ZONE_CODES.items():
-        params = {
-            "securityToken": API_KEY,
-            "documentType": "A44",
-            "in_Domain": zone,
-            "out_Domain": zone,
-            "periodStart": start,
-            "periodEnd": end,
-        }
-        
-        try:
-            r = requests.get(url, params=params, timeout=10)
-            has_data = r.status_code == 200 and "<Acknowledgement_MarketDocument" not in r.text
+    # Probe all zones at once, then report in ZONE_CODES order
+    outcomes = run_probes([lambda zone=zone: probe_day(zone, test_date)
+                           for zone in ZONE_CODES.values()])
+    
+    for (country, zone), (outcome, value) in zip(ZONE_CODES.items(), outcomes):
+        if outcome == "ok":
+            has_data = value
             status = "✅" if has_data else "❌"
             results.append((country, zone, has_data))
             print(f"{status} {country:3} ({zone[:10]}...): {'Data available' if has_data else 'No data'}")
-        except Exception as e:
-            print(f"⚠️  {country:3}: Error - {str(e)[:50]}")
+        elif outcome == "error":
+            print(f"⚠️  {country:3}: Error - {str(value)[:50]}")
+            results.append((country, zone, False))
+        else:
+            print(f"⏱️  {country:3}: No response within {PROBE_DEADLINE}s")
             results.append((country, zone, False))
     
     # Summary
@@ -112,57 +215,137 @@ def test_multiple_zones():
         return []
 
 
-def test_date_range(zone, country_code):
-    """Test a range of dates to find what works"""
+def _load_probe_cache():
+    try:
+        with open(PROBE_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_probe_cache(cache):
+    os.makedirs(os.path.dirname(PROBE_CACHE_FILE), exist_ok=True)
+    with open(PROBE_CACHE_FILE, "w") as f:
+        json.dump(cache, f, indent=2)
+
+
+def _logged_probe(zone):
+    """probe_day wrapper that prints each request and counts them"""
+    calls = []
+
+    def probe(day):
+        known = AVAILABILITY.status(zone, day) if AVAILABILITY is not None else None
+        if known is not None:
+            return known
+        has_data = probe_day(zone, day)
+        calls.append(day)
+        print(f"{'✅' if has_data else '❌'} {day.isoformat()}")
+        return has_data
+
+    return probe, calls
+
+
+def find_latest_available_day(zone, probe=None):
+    """Newest delivery day with data, found in O(log n) requests.
+
+    Gallops back from tomorrow (day-ahead prices are published the day
+    before delivery) in steps of 1, 2, 4, ... days until a day with data is
+    hit, then bisects between the last empty and the first non-empty day.
+    Assumes the published days form one contiguous range.
+    """
+    probe = probe or (lambda day: probe_day_indexed(zone, day))
+    newest = date.today() + timedelta(days=1)
+    if probe(newest):
+        return newest
+
+    limit = (newest - EARLIEST_DATA_DAY).days
+    empty_offset, step = 0, 1
+    while not probe(newest - timedelta(days=step)):
+        empty_offset = step
+        if step >= limit:
+            return None
+        step = min(step * 2, limit)
+
+    # Invariant: empty_offset has no data, step has data
+    while step - empty_offset > 1:
+        middle = (empty_offset + step) // 2
+        if probe(newest - timedelta(days=middle)):
+            step = middle
+        else:
+            empty_offset = middle
+    return newest - timedelta(days=step)
+
+
+def find_oldest_available_day(zone, latest, probe=None):
+    """Oldest delivery day with data, searching back from a known day with data"""
+    probe = probe or (lambda day: probe_day_indexed(zone, day))
+    limit = (latest - EARLIEST_DATA_DAY).days
+
+    data_offset, step = 0, 1
+    while step <= limit and probe(latest - timedelta(days=step)):
+        data_offset = step
+        step *= 2
+    empty_offset = min(step, limit + 1)
+
+    # Invariant: data_offset has data, empty_offset has none (or is out of range)
+    while empty_offset - data_offset > 1:
+        middle = (data_offset + empty_offset) // 2
+        if probe(latest - timedelta(days=middle)):
+            data_offset = middle
+        else:
+            empty_offset = middle
+    return latest - timedelta(days=data_offset)
+
+
+def test_date_range(zone, country_code, find_oldest=False, refresh=False):
+    """Find the newest (and optionally oldest) day with data for a zone"""
     print("\n" + "=" * 70)
     print(f"📅 TESTING DATE RANGE FOR {country_code}")
     print("=" * 70)
     
-    url = "https://web-api.tp.entsoe.eu/api"
-    today = datetime.now()
+    cache = _load_probe_cache()
+    entry = cache.get(zone, {})
     
-    test_ranges = [
-        ("Today", 0),
-        ("Yesterday", 1),
-        ("2 days ago", 2),
-        ("3 days ago", 3),
-        ("1 week ago", 7),
-        ("2 weeks ago", 14),
-        ("1 month ago", 30),
-        ("2 months ago", 60),
-        ("3 months ago", 90),
-    ]
-    
-    for label, days_ago in test_ranges:
-        test_date = today - timedelta(days=days_ago)
-        start = test_date.strftime("%Y%m%d") + "0000"
-        end = (test_date + timedelta(days=1)).strftime("%Y%m%d") + "0000"
-        
-        params = {
-            "securityToken": API_KEY,
-            "documentType": "A44",
-            "in_Domain": zone,
-            "out_Domain": zone,
-            "periodStart": start,
-            "periodEnd": end,
-        }
+    # The newest day moves forward every day; the oldest one never changes
+    checked_at = entry.get("latest_checked_at")
+    fresh = checked_at and (datetime.now() - datetime.fromisoformat(checked_at)
+                            < timedelta(hours=PROBE_CACHE_HOURS))
+    
+    probe, calls = _logged_probe(zone)
+    # The searches probe one day at a time; the whole search shares one
+    # probe_deadline, retries included
+    _probe_context.deadline = time.monotonic() + PROBE_DEADLINE
+    try:
+        if fresh and not refresh and "latest" in entry:
+            latest = entry["latest"] and date.fromisoformat(entry["latest"])
+            print(f"💾 Cached result from {checked_at}")
+        else:
+            latest = find_latest_available_day(zone, probe)
+            entry["latest"] = latest.isoformat() if latest else None
+            entry["latest_checked_at"] = datetime.now().isoformat(timespec="seconds")
         
-        try:
-            r = requests.get(url, params=params, timeout=10)
-            has_data = r.status_code == 200 and "<Acknowledgement_MarketDocument" not in r.text
-            
-            if has_data:
-                status = "✅ FOUND"
-                print(f"{status} {label:15} ({test_date.strftime('%Y-%m-%d')})")
-                return test_date
-            else:
-                status = "❌"
-                print(f"{status} {label:15} ({test_date.strftime('%Y-%m-%d')})")
-                
-        except Exception as e:
-            print(f"⚠️  {label:15}: Error - {str(e)[:50]}")
+        if latest and find_oldest:
+            if refresh or "oldest" not in entry:
+                entry["oldest"] = find_oldest_available_day(zone, latest, probe).isoformat()
+            print(f"📜 Oldest day with data: {entry['oldest']}")
+    except Exception as e:
+        # Only answers from complete searches are cached
+        if time.monotonic() >= _probe_context.deadline:
+            print(f"⏱️  No answer within {PROBE_DEADLINE}s ({len(calls)} requests)")
+        else:
+            print(f"⚠️  Error - {str(e)[:50]}")
+        return None
+    finally:
+        _probe_context.deadline = None
+    
+    cache[zone] = entry
+    _save_probe_cache(cache)
     
-    return None
+    if latest:
+        print(f"✅ FOUND newest day with data: {latest.isoformat()} ({len(calls)} requests)")
+    else:
+        print(f"❌ No data found since {EARLIEST_DATA_DAY.isoformat()} ({len(calls)} requests)")
+    return latest
 
 
 def detailed_api_response(zone, date):
@@ -171,7 +354,6 @@ def detailed_api_response(zone, date):
     print("🔍 DETAILED API RESPONSE")
     print("=" * 70)
     
-    url = "https://web-api.tp.entsoe.eu/api"
     start = date.strftime("%Y%m%d") + "0000"
     end = (date + timedelta(days=1)).strftime("%Y%m%d") + "0000"
     
@@ -185,7 +367,7 @@ def detailed_api_response(zone, date):
     }
     
     try:
-        r = requests.get(url, params=params, timeout=10)
+        r = entsoe_get(params, session=SESSION, **HTTP_OPTIONS)
         print(f"📡 URL: {r.url}")
         print(f"🔑 Status: {r.status_code}")
         print(f"📏 Response size: {len(r.text)} bytes")
@@ -199,6 +381,13 @@ def detailed_api_response(zone, date):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ENTSO-E API diagnostic tool")
+    parser.add_argument("--oldest", action="store_true",
+                        help="also search for the oldest day with data")
+    parser.add_argument("--refresh", action="store_true",
+                        help="ignore cached search results and probe again")
+    args = parser.parse_args()
+    
     if not API_KEY:
         print("❌ No API key found in config.json")
         exit(1)
@@ -227,7 +416,8 @@ if __name__ == "__main__":
     
     for country in available_zones[:3]:  # Test first 3 available
         zone = ZONE_CODES[country]
-        found_date = test_date_range(zone, country)
+        found_date = test_date_range(zone, country, find_oldest=args.oldest,
+                                     refresh=args.refresh)
         
         if found_date:
             print(f"\n🎯 SUCCESS! Found data for {country} on {found_date.strftime('%Y-%m-%d')}")
@@ -0,0 +1,59 @@
+"""Per-zone stage timings and counters for processor runs.
+
+Fetch threads, the event loop and the main thread all add to the same
+zone's counters; stage durations are accumulated with timed(). When a zone
+is finished its totals are appended as one JSON line to a metrics file, so
+runs can be compared and regressions alerted on.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+class StageMetrics:
+    """Thread-safe counters keyed by zone"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._zones = defaultdict(dict)
+
+    def add(self, zone, **counters):
+        with self._lock:
+            values = self._zones[zone]
+            for name, value in counters.items():
+                values[name] = values.get(name, 0) + value
+
+    def maximum(self, zone, **observations):
+        with self._lock:
+            values = self._zones[zone]
+            for name, value in observations.items():
+                values[name] = max(values.get(name, value), value)
+
+    @contextmanager
+    def timed(self, zone, stage):
+        """Add the wall time of the block to <stage>_seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(zone, **{f"{stage}_seconds": time.perf_counter() - started})
+
+    def snapshot(self, zone):
+        with self._lock:
+            values = dict(self._zones.get(zone, {}))
+        return {name: round(value, 4) if isinstance(value, float) else value
+                for name, value in sorted(values.items())}
+
+    def emit(self, zone, path):
+        """Append the zone's totals as a JSON line to path"""
+        record = {"time": datetime.now(timezone.utc).isoformat(), "zone": zone}
+        record.update(self.snapshot(zone))
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock, open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
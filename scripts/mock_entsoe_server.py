@@ -0,0 +1,172 @@
+"""Local stand-in for the ENTSO-E Transparency Platform API.
+
+Serves synthetic A44 day-ahead documents for any zone, Acknowledgement
+documents for days without data, 401 for a wrong security token, 429 once a
+per-minute quota is exceeded and random 5xx errors, with configurable
+latency. Point the scripts at it with "api_base_url" in config.json:
+
+    python scripts/mock_entsoe_server.py --port 8080 --latency 0.2 --error-rate 0.05
+    "api_base_url": "http://127.0.0.1:8080/api"
+"""
+import argparse
+import collections
+import gzip
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from synthetic_entsoe import PERIOD_FORMAT, a44_document, acknowledgement_document
+
+SERVER_ERROR_CODES = [500, 502, 503, 504]
+
+
+class MockState:
+    """Settings and counters shared by all handler threads"""
+
+    def __init__(self, args):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.lock = threading.Lock()
+        self.request_times = collections.deque()
+        self.status_counts = collections.Counter()
+
+    def rate_limited(self):
+        # Sliding one-minute window, like the platform's per-user quota
+        if not self.args.requests_per_minute:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            while self.request_times and now - self.request_times[0] > 60:
+                self.request_times.popleft()
+            if len(self.request_times) >= self.args.requests_per_minute:
+                return True
+            self.request_times.append(now)
+        return False
+
+    def server_error(self):
+        with self.lock:
+            if self.random.random() < self.args.error_rate:
+                return self.random.choice(SERVER_ERROR_CODES)
+        return None
+
+    def latency(self):
+        with self.lock:
+            return max(0.0, self.args.latency + self.random.uniform(-self.args.jitter, self.args.jitter))
+
+    def count(self, status):
+        with self.lock:
+            self.status_counts[status] += 1
+
+
+def published_window(args, start, end):
+    """Clip the requested window to the days that have data, None if there are none"""
+    first = datetime.combine(args.first_day, datetime.min.time())
+    # Day-ahead prices for tomorrow are published around noon CET
+    last = datetime.combine(datetime.now(timezone.utc).date() + timedelta(days=2), datetime.min.time())
+    start, end = max(start, first), min(end, last)
+    return (start, end) if start < end else None
+
+
+def make_handler(state):
+    args = state.args
+
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *log_args):
+            if args.verbose:
+                super().log_message(format, *log_args)
+
+        def send_document(self, status, text, headers=None):
+            body = text.encode("utf-8")
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body, compresslevel=1)
+                headers = dict(headers or {}, **{"Content-Encoding": "gzip"})
+            self.send_response(status)
+            self.send_header("Content-Type", "text/xml; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            state.count(status)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            time.sleep(state.latency())
+
+            if url.path.rstrip("/") != args.path.rstrip("/"):
+                return self.send_document(404, acknowledgement_document("Not found"))
+            if not params.get("securityToken") or (args.token and params["securityToken"] != args.token):
+                return self.send_document(401, "<html><body>Unauthorized</body></html>")
+            if state.rate_limited():
+                return self.send_document(429, acknowledgement_document("Too many requests"),
+                                          {"Retry-After": str(args.retry_after)})
+            error = state.server_error()
+            if error:
+                return self.send_document(error, "<html><body>Service unavailable</body></html>")
+
+            try:
+                zone = params["in_Domain"]
+                start = datetime.strptime(params["periodStart"], PERIOD_FORMAT)
+                end = datetime.strptime(params["periodEnd"], PERIOD_FORMAT)
+            except (KeyError, ValueError) as e:
+                return self.send_document(400, acknowledgement_document(f"Invalid query: {e}"))
+            if params.get("documentType") != "A44" or end <= start:
+                return self.send_document(400, acknowledgement_document("Invalid query"))
+            if end - start > timedelta(days=366):
+                return self.send_document(400, acknowledgement_document(
+                    "The amount of requested data exceeds allowed limit"))
+
+            window = published_window(args, start, end)
+            if window is None or zone in args.empty_zones:
+                return self.send_document(200, acknowledgement_document())
+            self.send_document(200, a44_document(zone, *window, resolution=args.resolution,
+                                                 curve_type=args.curve_type))
+
+    return MockHandler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve a local mock of the ENTSO-E API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--path", default="/api", help="path of the API endpoint")
+    parser.add_argument("--token", help="only accept this securityToken (default: any)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± seconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="share of requests answered with a random 5xx")
+    parser.add_argument("--requests-per-minute", type=int, default=400,
+                        help="quota before answering 429 (0 disables)")
+    parser.add_argument("--retry-after", type=int, default=1,
+                        help="Retry-After seconds sent with 429")
+    parser.add_argument("--first-day", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(),
+                        default=datetime(2015, 1, 5).date(),
+                        help="first day with data; earlier days get an Acknowledgement")
+    parser.add_argument("--empty-zones", nargs="*", default=[],
+                        help="EIC codes that never have data")
+    parser.add_argument("--resolution", type=int, default=60, choices=[15, 30, 60])
+    parser.add_argument("--curve-type", default="A01", choices=["A01", "A03"])
+    parser.add_argument("--seed", type=int, help="seed for latency and error injection")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    state = MockState(args)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    print(f"🧪 Mock ENTSO-E API on http://{args.host}:{args.port}{args.path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 Responses by status: {dict(sorted(state.status_counts.items()))}")
@@ -0,0 +1,125 @@
+"""Plot rendering for processed day-ahead prices.
+
+Imported only when plots are requested. A non-interactive backend is forced
+before pyplot is loaded so rendering works on headless servers.
+"""
+import os
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+LINEPLOT_FIGSIZE = (10, 5)
+LINEPLOT_DPI = 100
+
+
+def minmax_downsample(x, y, buckets):
+    """Keep the minimum and maximum point of each of `buckets` consecutive buckets.
+
+    Rendering cost then depends on the figure width instead of the series
+    length, while every peak and trough stays visible.
+    """
+    n = len(y)
+    if buckets <= 0 or n <= 2 * buckets:
+        return x, y
+
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    rows = padded.reshape(buckets, size)
+    valid = ~np.isnan(rows).all(axis=1)
+
+    offsets = np.arange(buckets)[valid] * size
+    lows = offsets + np.nanargmin(rows[valid], axis=1)
+    highs = offsets + np.nanargmax(rows[valid], axis=1)
+    keep = np.unique(np.concatenate([lows, highs]))
+    return x[keep], y[keep]
+
+
+def day_slot_matrix(timestamps, values, slot_minutes=60):
+    """Mean value per local day and slot of the day as a (days, slots) frame.
+
+    Works on local wall-clock epoch minutes with integer floor division, so it
+    handles hourly and 15-minute data alike. Slots repeated on DST fall-back
+    days are averaged and missing slots stay NaN; days without data are dropped.
+    """
+    slots_per_day = 1440 // slot_minutes
+    wall_minutes = timestamps.dt.tz_localize(None).to_numpy(dtype="datetime64[m]").view("int64")
+    values = np.asarray(values, dtype="float64")
+    present = ~np.isnan(values)
+    if not present.any():
+        return pd.DataFrame()
+    wall_minutes, values = wall_minutes[present], values[present]
+
+    days = wall_minutes // 1440
+    first_day = days.min()
+    n_days = int(days.max() - first_day) + 1
+    cells = (days - first_day) * slots_per_day + (wall_minutes % 1440) // slot_minutes
+
+    sums = np.zeros(n_days * slots_per_day)
+    counts = np.zeros(n_days * slots_per_day)
+    np.add.at(sums, cells, values)
+    np.add.at(counts, cells, 1)
+    with np.errstate(invalid="ignore"):
+        matrix = (sums / counts).reshape(n_days, slots_per_day)
+
+    has_data = counts.reshape(n_days, slots_per_day).any(axis=1)
+    labels = (first_day + np.arange(n_days)[has_data]).astype("datetime64[D]").astype(str)
+    if slot_minutes == 60:
+        columns = np.arange(slots_per_day)
+    else:
+        columns = [f"{m // 60:02d}:{m % 60:02d}" for m in range(0, 1440, slot_minutes)]
+    return pd.DataFrame(matrix[has_data], index=labels, columns=columns)
+
+
+def plot_prices(df, zone, timezone="local"):
+    if df.empty:
+        return
+
+    os.makedirs("data", exist_ok=True)
+
+    # Line plot
+    # One min/max pair per horizontal pixel of the figure
+    buckets = int(LINEPLOT_FIGSIZE[0] * LINEPLOT_DPI)
+    x, y = minmax_downsample(df["timestamp_local"].values,
+                             df["price_EUR_MWh"].to_numpy(dtype="float64"), buckets)
+    marker = "o" if len(y) == len(df) else None
+
+    plt.figure(figsize=LINEPLOT_FIGSIZE, dpi=LINEPLOT_DPI)
+    plt.plot(x, y, marker=marker, linestyle="-", markersize=2)
+    plt.title(f"Day-ahead prices for {zone}")
+    plt.ylabel("€/MWh")
+    plt.xlabel(f"Time ({timezone})")
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(f"data/{zone}_lineplot.png")
+    plt.close()
+    print(f"✅ Line plot saved")
+
+    # Heatmap
+    pivot = day_slot_matrix(df["timestamp_local"], df["price_EUR_MWh"], slot_minutes=60)
+
+    if not pivot.empty:
+        plt.figure(figsize=(12, 6))
+        sns.heatmap(pivot, cmap="viridis", cbar_kws={'label': '€/MWh'})
+        plt.title(f"Heatmap of day-ahead prices for {zone}")
+        plt.xlabel("Hour of day")
+        plt.ylabel("Date")
+        plt.tight_layout()
+        plt.savefig(f"data/{zone}_heatmap.png")
+        plt.close()
+        print(f"✅ Heatmap saved")
+
+
+def plot_price_arrays(zone, utc_ns, prices, timezone):
+    """plot_prices from plain arrays, as passed to plot worker processes"""
+    df = pd.DataFrame({
+        "timestamp_local": pd.to_datetime(utc_ns, utc=True).tz_convert(timezone),
+        "price_EUR_MWh": prices,
+    })
+    plot_prices(df, zone, timezone)
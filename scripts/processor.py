@@ -1,12 +1,25 @@
+import argparse
+import asyncio
+import hashlib
 import requests
+import numpy as np
 import pandas as pd
 import pytz
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import seaborn as sns
 import json
+import multiprocessing
 import os
+import re
+import time
 import xml.etree.ElementTree as ET
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from availability import AvailabilityIndex
+from entsoe_client import entsoe_get, http_options, make_session
+from metrics import StageMetrics
+from response_cache import ResponseCache
+import storage
 
 # Bidding zone codes
 ZONE_CODES = {
@@ -26,6 +39,18 @@ with open("config.json") as f:
 
 API_KEY = config.get("api_token") or config.get("ENTSOE_API_KEY", "")
 
+ENTSOE_DATETIME_FORMAT = "%Y%m%d%H%M"
+
+# Hive-style zone=/year=/month= Parquet dataset used by the "parquet_dataset" format
+DATASET_ROOT = os.path.join("data", "prices_dataset")
+
+# Stage timings and counters of this run, per zone
+METRICS = StageMetrics()
+
+# Which (zone, day) pairs are known to have data, shared with find_available_data.py
+AVAILABILITY = (AvailabilityIndex(os.path.join("data", "availability"))
+                if config.get("availability_index", True) else None)
+
 
 def format_entsoe_datetime(date_str, end=False):
     dt = datetime.strptime(date_str, "%Y-%m-%d")
@@ -34,13 +59,15 @@ def format_entsoe_datetime(date_str, end=False):
     return dt.strftime("%Y%m%d%H00")
 
 
-def fetch_day_ahead_prices(zone, start, end):
-    if not API_KEY:
-        print("❌ No API key set in config.json")
+def make_cache():
+    if not config.get("cache_enabled", True):
         return None
+    ttl_hours = config.get("cache_ttl_hours", 6)
+    return ResponseCache(os.path.join("data", "cache"), volatile_ttl=ttl_hours * 3600)
+
 
-    url = "https://web-api.tp.entsoe.eu/api"
-    params = {
+def build_params(zone, start, end):
+    return {
         "securityToken": API_KEY,
         "documentType": "A44",
         "in_Domain": zone,
@@ -49,38 +76,316 @@ def fetch_day_ahead_prices(zone, start, end):
         "periodEnd": end,
     }
 
-    r = requests.get(url, params=params)
-    if r.status_code != 200 or "<Acknowledgement_MarketDocument" in r.text:
-        print("⚠️ No data returned for this period.")
+
+def fetch_day_ahead_prices(zone, start, end, session=None, cache=None):
+    # Returns the XML text, "" when the period has no data, or None when the
+    # request failed (no token, connection error, non-200 after retries).
+    if not API_KEY:
+        print("❌ No API key set in config.json")
         return None
 
-    return r.text
+    params = build_params(zone, start, end)
 
+    if cache is not None:
+        cached = cache.get(params)
+        if cached is not None:
+            METRICS.add(zone, cache_hits=1)
+            return cached
 
-def parse_prices(xml_data):
+    started = time.perf_counter()
     try:
-        root = ET.fromstring(xml_data)
-    except Exception:
+        r = entsoe_get(params, session=session, **http_options(config))
+    except requests.RequestException as e:
+        print(f"❌ Request failed for {zone} {start} - {end}: {e}")
+        METRICS.add(zone, failed_requests=1)
+        return None
+    finally:
+        # Latencies of concurrent requests overlap, so their sum is not the
+        # fetch stage's wall time (fetch_seconds)
+        latency = time.perf_counter() - started
+        METRICS.add(zone, request_seconds=latency)
+        METRICS.maximum(zone, request_max_seconds=latency)
+
+    return handle_response(zone, start, end, params, r.status_code, r.text, cache)
+
+
+def handle_response(zone, start, end, params, status_code, text, cache=None):
+    METRICS.add(zone, requests=1, bytes_downloaded=len(text))
+    no_data = "<Acknowledgement_MarketDocument" in text
+    if status_code == 200 and no_data and AVAILABILITY is not None:
+        AVAILABILITY.mark_period(zone, start, end, has_data=False)
+
+    if status_code != 200:
+        print(f"❌ Request failed for {zone} {start} - {end}: HTTP {status_code}")
+        METRICS.add(zone, failed_requests=1)
+        return None
+
+    if no_data:
+        print(f"⚠️ No data returned for {zone} {start} - {end}.")
+        return ""
+
+    if cache is not None:
+        cache.put(params, text)
+
+    return text
+
+
+def split_period(start, end, chunk="month"):
+    # Windows are aligned to calendar day/week/month boundaries and clipped to
+    # the requested range, so every request stays well under the API's
+    # one-year limit on A44 queries.
+    dt_start = datetime.strptime(start, ENTSOE_DATETIME_FORMAT)
+    dt_end = datetime.strptime(end, ENTSOE_DATETIME_FORMAT)
+
+    windows = []
+    current = dt_start
+    while current < dt_end:
+        day_start = current.replace(hour=0, minute=0)
+        if chunk == "day":
+            boundary = day_start + timedelta(days=1)
+        elif chunk == "week":
+            boundary = day_start + timedelta(days=7 - day_start.weekday())
+        elif chunk == "month":
+            boundary = (day_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        else:
+            raise ValueError(f"Unknown chunk size: {chunk}")
+
+        window_end = min(boundary, dt_end)
+        windows.append((current.strftime(ENTSOE_DATETIME_FORMAT),
+                        window_end.strftime(ENTSOE_DATETIME_FORMAT)))
+        current = window_end
+
+    return windows
+
+
+def plan_fetch(zone, start, end, chunk, cache=None):
+    # Days already in the cache are read from disk; only the missing runs of
+    # days are split into windows and requested from the API.
+    documents = []
+    runs = [(start, end)]
+    if cache is not None:
+        documents, runs = cache.plan(build_params(zone, start, end), start, end)
+        METRICS.add(zone, cache_hits=len(documents))
+    if AVAILABILITY is not None:
+        runs = AVAILABILITY.filter_runs(zone, runs)
+
+    windows = [window for run in runs for window in split_period(*run, chunk)]
+    return documents, windows
+
+
+def merge_documents(zone, documents, start, end):
+    with METRICS.timed(zone, "parse"):
+        frames = [parse_prices(doc) for doc in documents if doc]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
         return pd.DataFrame()
 
-    ns = {"ns": root.tag.split("}")[0].strip("{")}
-    records = []
+    df = pd.concat(frames, ignore_index=True)
+    df = df.drop_duplicates(subset="timestamp").sort_values("timestamp")
+
+    # Cached windows may extend beyond the requested period
+    period_start = pd.Timestamp(datetime.strptime(start, ENTSOE_DATETIME_FORMAT), tz="UTC")
+    period_end = pd.Timestamp(datetime.strptime(end, ENTSOE_DATETIME_FORMAT), tz="UTC")
+    df = df[(df["timestamp"] >= period_start) & (df["timestamp"] < period_end)]
+
+    if AVAILABILITY is not None:
+        AVAILABILITY.mark(zone, df["timestamp"].dt.date.unique(), has_data=True)
+
+    METRICS.add(zone, points=len(df))
+    return df.reset_index(drop=True)
+
+
+def fetch_day_ahead_prices_chunked(zone, start, end, chunk=None, max_workers=None,
+                                   session=None, cache=None):
+    chunk = chunk or config.get("chunk_size", "month")
+    max_workers = max_workers or config.get("max_workers", 4)
+
+    # Returns (df, failed) where failed lists the windows whose request failed
+    documents, windows = plan_fetch(zone, start, end, chunk, cache)
+    fetched = []
+    if windows:
+        with METRICS.timed(zone, "fetch"), \
+                ThreadPoolExecutor(max_workers=min(max_workers, len(windows))) as pool:
+            fetched = list(pool.map(
+                lambda w: fetch_day_ahead_prices(zone, *w, session=session, cache=cache),
+                windows))
+
+    failed = [window for window, doc in zip(windows, fetched) if doc is None]
+    return merge_documents(zone, documents + fetched, start, end), failed
+
+
+async def fetch_day_ahead_prices_async(jobs, cache=None):
+    # jobs is a list of (zone, start, end) windows; all of them are in flight
+    # on one event loop, bounded by max_concurrency and requests_per_minute.
+    from entsoe_async import ENTSOE_REQUESTS_PER_MINUTE, fetch_all
+
+    if not API_KEY:
+        print("❌ No API key set in config.json")
+        return [None] * len(jobs)
+
+    params_list = [build_params(*job) for job in jobs]
+    results = await fetch_all(
+        params_list,
+        max_concurrency=config.get("max_concurrency", 16),
+        requests_per_minute=config.get("requests_per_minute", ENTSOE_REQUESTS_PER_MINUTE),
+        **http_options(config))
+
+    documents = []
+    for (zone, start, end), params, result in zip(jobs, params_list, results):
+        if isinstance(result, Exception):
+            print(f"❌ Request failed for {zone} {start} - {end}: {result}")
+            METRICS.add(zone, failed_requests=1)
+            documents.append(None)
+        else:
+            documents.append(handle_response(zone, start, end, params, *result, cache=cache))
+    return documents
+
+
+def fetch_zones_async(zone_periods, chunk=None, cache=None):
+    # zone_periods maps zone -> (start, end); every zone's windows share one
+    # event loop, so the whole batch is limited only by the request quota.
+    # Returns zone -> (df, failed windows).
+    chunk = chunk or config.get("chunk_size", "month")
+
+    documents = {zone: [] for zone in zone_periods}
+    failed = {zone: [] for zone in zone_periods}
+    jobs = []
+    for zone, (start, end) in zone_periods.items():
+        cached, windows = plan_fetch(zone, start, end, chunk, cache)
+        documents[zone] += cached
+        jobs += [(zone, *window) for window in windows]
+
+    if jobs:
+        started = time.perf_counter()
+        fetched = asyncio.run(fetch_day_ahead_prices_async(jobs, cache))
+        # fetch_seconds is wall time, as with the threads engine; requests of
+        # all zones overlap on one loop, so each zone gets the batch time
+        for zone in {job[0] for job in jobs}:
+            METRICS.add(zone, fetch_seconds=time.perf_counter() - started)
+        for (zone, window_start, window_end), doc in zip(jobs, fetched):
+            if doc is None:
+                failed[zone].append((window_start, window_end))
+            documents[zone].append(doc)
+
+    return {zone: (merge_documents(zone, documents[zone], *period), failed[zone])
+            for zone, period in zone_periods.items()}
+
+
+# Characters handed to the XML parser at a time
+PARSE_CHUNK_SIZE = 64 * 1024
+
+RESOLUTION_PATTERN = re.compile(r"^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?$")
+
+
+def parse_resolution(resolution):
+    # ISO 8601 durations used by ENTSO-E: PT15M, PT30M, PT60M, PT1H, P1D, ...
+    match = RESOLUTION_PATTERN.match(resolution or "")
+    if not match or not any(match.groups()):
+        raise ValueError(f"Unsupported resolution: {resolution}")
+    days, hours, minutes = (int(value or 0) for value in match.groups())
+    return np.timedelta64((days * 24 + hours) * 60 + minutes, "m")
+
+
+def iter_parse_events(xml_data, chunk_size=PARSE_CHUNK_SIZE):
+    # Feeds the text (or bytes) to the parser in slices. Encoding it or
+    # wrapping it in StringIO, which widens it to 4 bytes per character,
+    # would copy the whole document first.
+    parser = ET.XMLPullParser(events=("start", "end"))
+    for offset in range(0, len(xml_data), chunk_size):
+        parser.feed(xml_data[offset:offset + chunk_size])
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def iter_periods(xml_data):
+    # Streams the document and yields each Period as soon as it closes, then
+    # clears it so memory stays flat regardless of the document size.
+    context = iter_parse_events(xml_data)
+    _, root = next(context)
+    ns = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+
+    period_tag = ns + "Period"
+    series_tag = ns + "TimeSeries"
+    curve_type_tag = ns + "curveType"
+    start_path = f"{ns}timeInterval/{ns}start"
+    end_path = f"{ns}timeInterval/{ns}end"
+    resolution_tag = ns + "resolution"
+    point_tag = ns + "Point"
+    position_tag = ns + "position"
+    price_tag = ns + "price.amount"
+
+    curve_type = "A01"
+    for event, elem in context:
+        if event != "end":
+            continue
+        if elem.tag == period_tag:
+            start_time = elem.findtext(start_path)
+            end_time = elem.findtext(end_path)
+            resolution = elem.findtext(resolution_tag, "PT60M")
+            positions = array("i")
+            prices = array("d")
+            for point in elem.iterfind(point_tag):
+                positions.append(int(point.findtext(position_tag)))
+                prices.append(float(point.findtext(price_tag)))
+            elem.clear()
+            yield start_time, end_time, resolution, curve_type, positions, prices
+        elif elem.tag == curve_type_tag:
+            curve_type = elem.text
+        elif elem.tag == series_tag:
+            curve_type = "A01"
+            root.clear()
+
+
+def expand_period(start_time, end_time, resolution, curve_type, positions, prices):
+    # Places the points on the Period's regular grid. Curve type A03 omits a
+    # point whenever the price repeats, so the gaps are forward-filled.
+    step = parse_resolution(resolution)
+    period_start = np.datetime64(start_time.rstrip("Z"), "ns")
+    positions = np.frombuffer(positions, dtype=np.int32).astype(np.int64)
+
+    if end_time:
+        period_end = np.datetime64(end_time.rstrip("Z"), "ns")
+        slots = int((period_end - period_start) // step)
+    else:
+        slots = int(positions.max()) if len(positions) else 0
+
+    inside = (positions >= 1) & (positions <= slots)
+    values = np.full(slots, np.nan)
+    values[positions[inside] - 1] = np.frombuffer(prices, dtype=np.float64)[inside]
+
+    if curve_type == "A03":
+        filled = np.where(np.isnan(values), 0, np.arange(slots))
+        values = values[np.maximum.accumulate(filled)]
+
+    present = ~np.isnan(values)
+    timestamps = period_start + np.arange(slots)[present] * step
+    return timestamps.astype("datetime64[ns]"), values[present], step
 
-    for ts in root.findall(".//ns:TimeSeries", ns):
-        for period in ts.findall(".//ns:Period", ns):
-            start_time = period.find("ns:timeInterval/ns:start", ns).text
-            dt_start = datetime.fromisoformat(start_time.replace("Z", "+00:00"))
 
-            for point in period.findall("ns:Point", ns):
-                pos = int(point.find("ns:position", ns).text)
-                price = float(point.find("ns:price.amount", ns).text)
-                ts_val = dt_start + timedelta(hours=pos - 1)
-                records.append((ts_val, price))
+def parse_prices(xml_data):
+    # Points are collected as typed arrays per Period and timestamps are
+    # computed in one vectorized step instead of one datetime per point.
+    periods = []
+
+    try:
+        for period in iter_periods(xml_data):
+            periods.append(expand_period(*period))
+    except (ET.ParseError, StopIteration, TypeError, ValueError):
+        return pd.DataFrame()
 
-    if not records:
+    if not periods:
         return pd.DataFrame()
 
-    return pd.DataFrame(records, columns=["timestamp", "price_EUR_MWh"])
+    # When a zone publishes several resolutions for the same day, the finest
+    # one wins any timestamp collision.
+    periods.sort(key=lambda period: period[2])
+    df = pd.DataFrame({
+        "timestamp": pd.DatetimeIndex(np.concatenate([p[0] for p in periods])).tz_localize("UTC"),
+        "price_EUR_MWh": np.concatenate([p[1] for p in periods]),
+    })
+    df = df.drop_duplicates(subset="timestamp").sort_values("timestamp")
+    return df.reset_index(drop=True)
 
 
 def normalize_to_kWh(df):
@@ -91,6 +396,18 @@ def normalize_to_kWh(df):
 
 def align_timezones(df):
     tz = config.get("timezone", "Europe/Nicosia")
+
+    if isinstance(df["timestamp"].dtype, pd.DatetimeTZDtype):
+        # parse_prices already yields datetime64[ns, UTC]: skip the coercion and
+        # NaT scan. Values are stored as UTC, so tz_convert only swaps the
+        # dtype's timezone and DST offsets are applied lazily when formatting.
+        utc = df["timestamp"]
+        if str(utc.dt.tz) != "UTC":
+            utc = utc.dt.tz_convert("UTC")
+        df["timestamp_utc"] = utc
+        df["timestamp_local"] = utc.dt.tz_convert(tz)
+        return df
+
     df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
     df = df.dropna(subset=["timestamp"])
 
@@ -103,77 +420,384 @@ def align_timezones(df):
     return df
 
 
-def save_outputs(df, zone, start, end):
-    os.makedirs("data", exist_ok=True)
+def _read_last_csv_timestamp(path):
+    # Rows are written in timestamp order, so the newest one is the last line
+    with open(path, "rb") as f:
+        header = f.readline().decode("utf-8").strip().split(",")
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(size - 4096, 0))
+        lines = [line for line in f.read().decode("utf-8").splitlines() if line.strip()]
+
+    if len(lines) < 2:
+        return None
+    last_row = lines[-1].split(",")
+    if storage.EPOCH_COLUMN in header:
+        return pd.Timestamp(int(last_row[header.index(storage.EPOCH_COLUMN)]), unit="s", tz="UTC")
+    if "timestamp_utc" in header:
+        return pd.Timestamp(last_row[header.index("timestamp_utc")]).tz_convert("UTC")
+    return None
+
+
+def parquet_part_files(zone):
+    parts_dir = f"data/{zone}_prices"
+    if not os.path.isdir(parts_dir):
+        return []
+    return sorted(os.path.join(parts_dir, name) for name in os.listdir(parts_dir)
+                  if name.endswith(".parquet"))
+
 
+def read_last_timestamp(zone):
     export_format = config.get("export_format", "csv").lower()
     if export_format == "csv":
         out_file = f"data/{zone}_prices.csv"
-        df.to_csv(out_file, index=False)
+        return _read_last_csv_timestamp(out_file) if os.path.exists(out_file) else None
     elif export_format == "parquet":
-        out_file = f"data/{zone}_prices.parquet"
-        df.to_parquet(out_file, index=False)
+        paths = parquet_part_files(zone)
+        if os.path.exists(f"data/{zone}_prices.parquet"):
+            paths.append(f"data/{zone}_prices.parquet")
+        return storage.last_timestamp(paths)
+    elif export_format == "parquet_dataset":
+        return storage.last_timestamp(storage.latest_partition_files(DATASET_ROOT, zone))
+    return None
+
+
+def compact_dtype():
+    if config.get("storage_schema", "full") != "compact":
+        return None
+    return config.get("compact_price_dtype", "float32")
+
+
+def storage_metadata():
+    if compact_dtype() is None:
+        return None
+    return storage.compact_metadata(config.get("timezone", "Europe/Nicosia"), compact_dtype())
+
+
+def storage_frame(df):
+    # The compact schema keeps one epoch and one price column; local time and
+    # kWh prices are rebuilt by storage.load_prices.
+    if compact_dtype() is None:
+        return df
+    return storage.to_compact(df, compact_dtype())
+
+
+def write_parquet(df, out_file):
+    storage.write_parquet(
+        storage_frame(df), out_file,
+        compression=config.get("parquet_compression", storage.DEFAULT_COMPRESSION),
+        metadata=storage_metadata())
+
+
+def write_dataset(df, zone, append=False):
+    # Returns the zone's dataset directory and the size of the files written
+    files = storage.write_partitioned_dataset(
+        df, zone, DATASET_ROOT,
+        compression=config.get("parquet_compression", storage.DEFAULT_COMPRESSION),
+        row_group_size=config.get("parquet_row_group_size", storage.DEFAULT_ROW_GROUP_SIZE),
+        append=append, compact_dtype=compact_dtype(), metadata=storage_metadata())
+    return storage.zone_dir(DATASET_ROOT, zone), sum(os.path.getsize(path) for path in files)
+
+
+def _append_outputs(df, zone):
+    # Returns the output path, the appended rows and the bytes this run wrote
+    last = read_last_timestamp(zone)
+    if last is not None:
+        df = df[df["timestamp_utc"] > last]
+    if df.empty:
+        return None, df, 0
+
+    export_format = config.get("export_format", "csv").lower()
+    if export_format == "csv":
+        out_file = f"data/{zone}_prices.csv"
+        size_before = os.path.getsize(out_file) if os.path.exists(out_file) else 0
+        if size_before:
+            with open(out_file) as f:
+                header = f.readline().strip().split(",")
+            storage_frame(df).reindex(columns=header).to_csv(
+                out_file, mode="a", header=False, index=False)
+        else:
+            storage_frame(df).to_csv(out_file, index=False)
+        bytes_written = os.path.getsize(out_file) - size_before
+    elif export_format == "parquet":
+        # Each run adds one part file instead of rewriting the existing data
+        os.makedirs(f"data/{zone}_prices", exist_ok=True)
+        first_ts = df["timestamp_utc"].iloc[0].strftime(ENTSOE_DATETIME_FORMAT)
+        last_ts = df["timestamp_utc"].iloc[-1].strftime(ENTSOE_DATETIME_FORMAT)
+        out_file = f"data/{zone}_prices/part-{first_ts}-{last_ts}.parquet"
+        write_parquet(df, out_file)
+        bytes_written = os.path.getsize(out_file)
+    elif export_format == "parquet_dataset":
+        out_file, bytes_written = write_dataset(df, zone, append=True)
+    return out_file, df, bytes_written
+
+
+def output_exists(zone, export_format):
+    if export_format == "csv":
+        return os.path.exists(f"data/{zone}_prices.csv")
+    if export_format == "parquet":
+        return os.path.exists(f"data/{zone}_prices.parquet")
+    return bool(storage.latest_partition_files(DATASET_ROOT, zone))
+
+
+def content_fingerprint(df, previous=None):
+    # sha256 of the rows as stored plus the settings that shape the files;
+    # incremental appends chain onto the previous fingerprint
+    stored = storage_frame(df)
+    digest = hashlib.sha256()
+    settings = [config.get("export_format", "csv").lower(), config.get("timezone", "Europe/Nicosia"),
+                stored.columns.tolist(), [str(dtype) for dtype in stored.dtypes]]
+    digest.update(json.dumps(settings).encode())
+    digest.update(pd.util.hash_pandas_object(stored, index=False).to_numpy().tobytes())
+    return chain_fingerprint(previous, digest.hexdigest())
+
+
+def chain_fingerprint(previous, fingerprint):
+    # Fingerprint of data built up write by write, without rereading it
+    if not previous:
+        return fingerprint
+    return hashlib.sha256(f"{previous}:{fingerprint}".encode()).hexdigest()
+
+
+def save_outputs(df, zone, start, end, incremental=False):
+    """Write the zone's prices and metadata; returns False if nothing changed"""
+    os.makedirs("data", exist_ok=True)
+
+    export_format = config.get("export_format", "csv").lower()
+    metadata_file = f"data/{zone}_metadata.json"
+    previous = {}
+    if os.path.exists(metadata_file):
+        with open(metadata_file) as f:
+            previous = json.load(f)
+
+    if not incremental:
+        fingerprint = content_fingerprint(df)
+        last_written = previous.get("written_fingerprint", previous.get("fingerprint"))
+        if last_written == fingerprint and output_exists(zone, export_format):
+            print(f"✅ {zone} unchanged, keeping existing outputs")
+            return False
+
+    with METRICS.timed(zone, "write"):
+        if incremental:
+            out_file, df, bytes_written = _append_outputs(df, zone)
+            if out_file is None:
+                print(f"✅ {zone} already up to date")
+                return False
+            fingerprint = content_fingerprint(df, previous.get("fingerprint"))
+        elif export_format == "csv":
+            out_file = f"data/{zone}_prices.csv"
+            storage_frame(df).to_csv(out_file, index=False)
+            bytes_written = os.path.getsize(out_file)
+        elif export_format == "parquet":
+            out_file = f"data/{zone}_prices.parquet"
+            write_parquet(df, out_file)
+            bytes_written = os.path.getsize(out_file)
+            # A full rewrite supersedes parts appended by earlier incremental runs
+            for part in parquet_part_files(zone):
+                os.remove(part)
+        elif export_format == "parquet_dataset":
+            out_file, bytes_written = write_dataset(df, zone)
+    METRICS.add(zone, rows_written=len(df), output_bytes=bytes_written)
+
+    previous_period = previous.get("period", {})
+    if incremental:
+        period = {"start": previous_period.get("start", start), "end": end}
+        record_count = previous.get("record_count", 0) + len(df)
+    else:
+        period = {"start": start, "end": end}
+        record_count = len(df)
+
+    dataset_fields = {}
+    if export_format == "parquet_dataset":
+        # The dataset is upserted and keeps rows outside df's range, so the
+        # metadata describes what is stored: row counts and time ranges per
+        # partition come from the footers of the partitions this write
+        # touched, and the fingerprint chains onto the previous one.
+        # written_fingerprint identifies the rows of this write for the
+        # unchanged check.
+        partitions = previous.get("partitions") if previous.get("export_format") == export_format else None
+        if partitions is None:
+            # No summaries yet: read every partition's footers once
+            partitions = storage.partition_summaries(DATASET_ROOT, zone)
+        else:
+            partitions.update(storage.partition_summaries(DATASET_ROOT, zone, storage.partition_keys(df)))
+        first = min(summary["first"] for summary in partitions.values())
+        period = {"start": min(period["start"], previous_period.get("start", first), first),
+                  "end": max(end, previous_period.get("end", end))}
+        record_count = sum(summary["rows"] for summary in partitions.values())
+        if not incremental:
+            dataset_fields["written_fingerprint"] = fingerprint
+            fingerprint = chain_fingerprint(previous.get("fingerprint"), fingerprint)
+        dataset_fields["partitions"] = dict(sorted(partitions.items()))
 
     metadata = {
         "zone": zone,
         "source": "ENTSO-E Transparency Platform",
         "retrieval_time": datetime.now().astimezone(pytz.UTC).isoformat(),
-        "period": {"start": start, "end": end},
+        "period": period,
         "normalized_to_kWh": config.get("normalize_to_kwh", True),
         "timezone": config.get("timezone", "Europe/Nicosia"),
-        "columns": df.columns.tolist(),
-        "record_count": len(df)
+        "export_format": export_format,
+        "columns": storage_frame(df.head(0)).columns.tolist(),
+        "record_count": record_count,
+        "fingerprint": fingerprint,
+        **dataset_fields,
+        "metrics": METRICS.snapshot(zone)
     }
-    with open(f"data/{zone}_metadata.json", "w") as f:
+    if storage_metadata() is not None:
+        metadata.update(storage_metadata())
+    with open(metadata_file, "w") as f:
         json.dump(metadata, f, indent=2)
 
-    print(f"✅ Data saved: {out_file}")
+    print(f"✅ Data saved: {out_file} ({len(df)} records)")
+    return True
+
+
+PLOT_COLUMNS = ["timestamp_utc", "timestamp_local", "price_EUR_MWh"]
 
 
 def plot_prices(df, zone):
+    # Imported lazily so runs without plots never load matplotlib/seaborn
+    import plotting
+
+    plotting.plot_prices(df, zone, config.get("timezone", "local"))
+
+
+def render_plots(zone, utc_ns, prices, timezone):
+    # Runs in a plot worker process; only plain arrays cross the process
+    # boundary. Returns the render time for the parent's metrics.
+    started = time.perf_counter()
+    import plotting
+
+    plotting.plot_price_arrays(zone, utc_ns, prices, timezone)
+    return time.perf_counter() - started
+
+
+def emit_metrics(zone):
+    metrics_file = config.get("metrics_file", "data/metrics.jsonl")
+    if metrics_file:
+        METRICS.emit(zone, metrics_file)
+
+
+def make_plot_pool():
+    plot_workers = config.get("plot_workers", 0)
+    if not config.get("make_plots", True) or plot_workers <= 0:
+        return None
+    # spawn: forking a process that runs fetch threads is not safe
+    return ProcessPoolExecutor(max_workers=plot_workers,
+                               mp_context=multiprocessing.get_context("spawn"))
+
+
+def submit_plots(plot_pool, df, zone):
+    utc_ns = df["timestamp_utc"].dt.tz_convert("UTC").dt.tz_localize(None)
+    return plot_pool.submit(render_plots, zone, utc_ns.to_numpy(dtype="datetime64[ns]").view("int64"),
+                            df["price_EUR_MWh"].to_numpy(dtype="float64"),
+                            config.get("timezone", "Europe/Nicosia"))
+
+
+def resolve_zones(zones):
+    if not zones:
+        return [config.get("country_code", "CY")]
+    if len(zones) == 1 and zones[0].lower() == "all":
+        return list(ZONE_CODES)
+    return zones
+
+
+def fetch_start(zone, start, end, incremental=False):
+    # In incremental mode only periods newer than the stored data are
+    # requested; None means the zone is already up to date.
+    if incremental:
+        last = read_last_timestamp(zone)
+        if last is not None:
+            resume = (last + pd.Timedelta(minutes=1)).ceil("h")
+            start = max(start, resume.strftime(ENTSOE_DATETIME_FORMAT))
+    return start if start < end else None
+
+
+def prepare_prices(df, zone):
     if df.empty:
+        return df
+
+    if config.get("normalize_to_kwh", True):
+        with METRICS.timed(zone, "normalize"):
+            df = normalize_to_kWh(df)
+
+    with METRICS.timed(zone, "align"):
+        return align_timezones(df)
+
+
+def process_zone(country, start, end, session=None, cache=None, incremental=False):
+    zone = ZONE_CODES.get(country, country)
+
+    start = fetch_start(zone, start, end, incremental)
+    if start is None:
+        return zone, None, []
+
+    df, failed = fetch_day_ahead_prices_chunked(zone, start, end, session=session, cache=cache)
+    return zone, prepare_prices(df, zone), failed
+
+
+def process_zones_async(countries, start, end, cache=None, incremental=False):
+    zone_periods = {}
+    for country in countries:
+        zone = ZONE_CODES.get(country, country)
+        zone_start = fetch_start(zone, start, end, incremental)
+        if zone_start is None:
+            yield country, zone, None, []
+        else:
+            zone_periods[country] = (zone, zone_start)
+
+    frames = fetch_zones_async({zone: (zone_start, end)
+                                for zone, zone_start in zone_periods.values()}, cache=cache)
+
+    for country, (zone, _) in zone_periods.items():
+        df, failed = frames[zone]
+        yield country, zone, prepare_prices(df, zone), failed
+
+
+def iter_zone_results(countries, start, end, session=None, cache=None, incremental=False):
+    # Yields (country, zone, df, failed) as zones complete; df is None when an
+    # incremental run finds the zone already up to date and failed lists the
+    # (start, end) windows that could not be fetched.
+    if config.get("fetch_engine", "threads") == "asyncio":
+        yield from process_zones_async(countries, start, end, cache, incremental)
         return
 
-    os.makedirs("data", exist_ok=True)
+    with ThreadPoolExecutor(max_workers=len(countries)) as pool:
+        futures = {pool.submit(process_zone, country, start, end, session, cache,
+                               incremental): country
+                   for country in countries}
 
-    # Line plot
-    plt.figure(figsize=(10, 5))
-    plt.plot(df["timestamp_local"].values, df["price_EUR_MWh"].values,
-             marker="o", linestyle="-", markersize=2)
-    plt.title(f"Day-ahead prices for {zone}")
-    plt.ylabel("€/MWh")
-    plt.xlabel(f"Time ({config.get('timezone', 'local')})")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(f"data/{zone}_lineplot.png")
-    plt.close()
-    print(f"✅ Line plot saved")
-
-    # Heatmap
-    df["hour"] = df["timestamp_local"].dt.hour
-    df["day"] = df["timestamp_local"].dt.date
-    df = df.groupby(["day", "hour"], as_index=False)["price_EUR_MWh"].mean()
-    pivot = df.pivot(index="day", columns="hour", values="price_EUR_MWh")
-
-    if not pivot.empty:
-        plt.figure(figsize=(12, 6))
-        sns.heatmap(pivot, cmap="viridis", cbar_kws={'label': '€/MWh'})
-        plt.title(f"Heatmap of day-ahead prices for {zone}")
-        plt.xlabel("Hour of day")
-        plt.ylabel("Date")
-        plt.tight_layout()
-        plt.savefig(f"data/{zone}_heatmap.png")
-        plt.close()
-        print(f"✅ Heatmap saved")
+        for future in as_completed(futures):
+            country = futures[future]
+            try:
+                zone, df, failed = future.result()
+            except Exception as e:
+                print(f"❌ {country}: {e}")
+                yield country, ZONE_CODES.get(country, country), pd.DataFrame(), [(start, end)]
+                continue
+            yield country, zone, df, failed
 
 
-if __name__ == "__main__":
+def parse_args():
+    parser = argparse.ArgumentParser(description="ENTSO-E Day-Ahead Price Processor")
+    parser.add_argument("--zones", nargs="+",
+                        help='country codes / EIC codes to process, or "all"')
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fetch and append periods newer than the stored data")
+    parser.add_argument("--profile", nargs="?", const="cpu", choices=["cpu", "memory", "both"],
+                        help="run under cProfile and/or tracemalloc and save reports to data/")
+    return parser.parse_args()
+
+
+def main(args=None):
+    args = args or parse_args()
+
     print("=" * 60)
     print("ENTSO-E Day-Ahead Price Processor")
     print("=" * 60)
 
-    country = config.get("country_code", "CY")
-    zone = ZONE_CODES.get(country, country)
+    countries = resolve_zones(args.zones or config.get("zones"))
 
     start_date = config.get("start_date", "2025-01-01")
     end_date = config.get("end_date", "2025-01-02")
@@ -181,24 +805,87 @@ if __name__ == "__main__":
     start = format_entsoe_datetime(start_date)
     end = format_entsoe_datetime(end_date, end=True)
 
-    xml_data = fetch_day_ahead_prices(zone, start, end)
-    if xml_data is None:
+    incremental = args.incremental or config.get("incremental", False)
+    # One keep-alive connection pool shared by every zone and chunk request
+    session = make_session(pool_size=len(countries) * config.get("max_workers", 4))
+    cache = make_cache()
+    plot_pool = make_plot_pool()
+    plot_futures = {}
+    processed = 0
+    failed_zones = []
+
+    # Zones are fetched concurrently; outputs and plots are written from the
+    # main thread as each zone completes.
+    for country, zone, df, failed in iter_zone_results(countries, start, end, session, cache,
+                                                       incremental):
+        if failed:
+            # Saving would leave holes that later (incremental) runs never
+            # refetch, so the zone is not written and the run fails.
+            windows = ", ".join(f"{window_start} - {window_end}" for window_start, window_end in failed)
+            print(f"❌ {country}: {len(failed)} window(s) failed ({windows}); outputs not updated")
+            METRICS.add(zone, failed_windows=len(failed))
+            emit_metrics(zone)
+            failed_zones.append(country)
+            continue
+
+        if df is None:
+            print(f"✅ {country} already up to date")
+            processed += 1
+            continue
+
+        if df.empty:
+            print(f"⚠️ No data fetched for {country}.")
+            emit_metrics(zone)
+            continue
+
+        changed = save_outputs(df, zone, start, end, incremental=incremental)
+        processed += 1
+
+        if not changed and os.path.exists(f"data/{zone}_lineplot.png"):
+            emit_metrics(zone)
+            continue
+
+        if incremental and config.get("make_plots", True):
+            # df only holds the newly appended tail; plot the whole stored history
+            df = storage.load_prices(zone, columns=PLOT_COLUMNS,
+                                     export_format=config.get("export_format", "csv").lower())
+
+        if plot_pool is not None:
+            # Rendering runs in worker processes while the next zone is exported
+            plot_futures[submit_plots(plot_pool, df, zone)] = (country, zone)
+        else:
+            if config.get("make_plots", True):
+                with METRICS.timed(zone, "plot"):
+                    plot_prices(df, zone)
+            emit_metrics(zone)
+
+    if plot_pool is not None:
+        for future in as_completed(plot_futures):
+            country, zone = plot_futures[future]
+            if future.exception() is not None:
+                print(f"❌ Plotting failed for {country}: {future.exception()}")
+            else:
+                METRICS.add(zone, plot_seconds=future.result())
+            emit_metrics(zone)
+        plot_pool.shutdown()
+
+    if not processed:
         print("⚠️ No data fetched, exiting.")
         exit(1)
 
-    df = parse_prices(xml_data)
-    if df.empty:
-        print("⚠️ No records parsed, exiting.")
+    print(f"\n✅ Finished! {processed}/{len(countries)} zones processed")
+    if failed_zones:
+        print(f"❌ Failed zones: {', '.join(failed_zones)}")
         exit(1)
 
-    if config.get("normalize_to_kwh", True):
-        df = normalize_to_kWh(df)
-
-    df = align_timezones(df)
 
-    save_outputs(df, zone, start, end)
-
-    if config.get("make_plots", True):
-        plot_prices(df, zone)
+if __name__ == "__main__":
+    args = parse_args()
+    profile = args.profile or config.get("profile")
+    if profile:
+        # Imported lazily; a normal run pays nothing for profiling support
+        import profiling
 
-    print("\n✅ Finished!")
+        profiling.run_profiled(lambda: main(args), "cpu" if profile is True else profile)
+    else:
+        main(args)
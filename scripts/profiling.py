@@ -0,0 +1,113 @@
+"""Run a function under cProfile and/or tracemalloc and dump the results.
+
+Used by processor.py with --profile or "profile" in config.json. CPU stats
+are saved both as a .prof file (for pstats, snakeviz, ...) and as text
+sorted by cumulative time; the memory report gives the traced peak and the
+top allocation sites still alive at the end of the run. Plot worker
+processes are not profiled.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from datetime import datetime
+
+PROFILE_MODES = ("cpu", "memory", "both")
+TOP_FUNCTIONS = 60
+TOP_ALLOCATIONS = 30
+TRACEBACK_FRAMES = 10
+
+
+class ThreadProfilers:
+    """cProfile for the calling thread and every thread started meanwhile.
+
+    Before Python 3.12 a profiler only sees the thread that enabled it, so each
+    new thread (fetch and parse workers) gets its own profiler, merged at the
+    end. From 3.12 on, one profiler already covers all threads.
+    """
+
+    def __init__(self):
+        self.profilers = [cProfile.Profile()]
+        self._lock = threading.Lock()
+
+    def _start_thread(self, *_):
+        profiler = cProfile.Profile()
+        with self._lock:
+            self.profilers.append(profiler)
+        profiler.enable()
+
+    def start(self):
+        if sys.version_info < (3, 12):
+            threading.setprofile(self._start_thread)
+        self.profilers[0].enable()
+
+    def stop(self):
+        self.profilers[0].disable()
+        threading.setprofile(None)
+        stats = pstats.Stats(self.profilers[0])
+        for profiler in self.profilers[1:]:
+            stats.add(profiler)
+        return stats
+
+
+def _write_cpu_report(stats, path_prefix):
+    stats.dump_stats(f"{path_prefix}.prof")
+    text = io.StringIO()
+    stats.stream = text
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    with open(f"{path_prefix}.txt", "w") as f:
+        f.write(text.getvalue())
+    print(f"✅ CPU profile saved: {path_prefix}.prof, {path_prefix}.txt")
+
+
+def _write_memory_report(snapshot, peak, path):
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ])
+    with open(path, "w") as f:
+        f.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n\n")
+        f.write(f"Top {TOP_ALLOCATIONS} allocation sites by size:\n")
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+            f.write(f"{stat}\n")
+        f.write(f"\nTop {TOP_ALLOCATIONS} allocation tracebacks:\n")
+        for stat in snapshot.statistics("traceback")[:TOP_ALLOCATIONS]:
+            f.write(f"\n{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+            f.write("\n".join(stat.traceback.format()) + "\n")
+    print(f"✅ Memory profile saved: {path} (peak {peak / 1024 / 1024:.1f} MiB)")
+
+
+def run_profiled(func, mode="cpu", output_dir="data"):
+    """Call func() under the profilers selected by mode (cpu, memory or both)"""
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode} (expected one of {', '.join(PROFILE_MODES)})")
+
+    profilers = ThreadProfilers() if mode in ("cpu", "both") else None
+    trace_memory = mode in ("memory", "both")
+    if trace_memory:
+        tracemalloc.start(TRACEBACK_FRAMES)
+    if profilers is not None:
+        profilers.start()
+
+    try:
+        return func()
+    finally:
+        # Also reached on exit(1), so failed runs leave a profile behind. The
+        # snapshot comes first so collecting CPU stats does not show up in it.
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        stats = profilers.stop() if profilers is not None else None
+
+        os.makedirs(output_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if stats is not None:
+            _write_cpu_report(stats, os.path.join(output_dir, f"profile_{stamp}"))
+        if trace_memory:
+            _write_memory_report(snapshot, peak, os.path.join(output_dir, f"memory_{stamp}.txt"))
@@ -0,0 +1,164 @@
+"""Persistent, compressed cache of raw ENTSO-E API responses.
+
+Each response is stored gzip-compressed under a content address derived from
+the query (documentType, in_Domain, out_Domain, periodStart, periodEnd). An
+index file records which delivery days every cached window covers, so a later
+run can reuse individual days and only request the days that are missing.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+CACHE_KEY_FIELDS = ("documentType", "in_Domain", "out_Domain", "periodStart", "periodEnd")
+PERIOD_FORMAT = "%Y%m%d%H%M"
+
+
+def cache_key(params):
+    """Content address of a query, ignoring the security token"""
+    raw = "|".join(str(params.get(field, "")) for field in CACHE_KEY_FIELDS)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _parse_period(value):
+    return datetime.strptime(value, PERIOD_FORMAT).replace(tzinfo=timezone.utc)
+
+
+class ResponseCache:
+    """Day-addressable cache of raw XML responses stored under cache_dir"""
+
+    def __init__(self, cache_dir, volatile_ttl=6 * 3600):
+        self.cache_dir = cache_dir
+        self.volatile_ttl = volatile_ttl
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()
+        self.evict_expired()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".xml.gz")
+
+    def _is_expired(self, entry, now=None):
+        # A response is final only if its window had already ended (UTC
+        # midnight of the day it was fetched). Windows that reached into that
+        # day or later may have been incomplete and only live for
+        # volatile_ttl seconds, even after their end date has passed.
+        now = now or time.time()
+        fetched_day = datetime.fromtimestamp(entry["fetched_at"], timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        if _parse_period(entry["periodEnd"]) <= fetched_day:
+            return False
+        return now - entry["fetched_at"] > self.volatile_ttl
+
+    def get(self, params):
+        """Return the cached response text for an exact query, or None"""
+        key = cache_key(params)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or self._is_expired(entry):
+                return None
+        return self._read(key)
+
+    def _read(self, key):
+        try:
+            with gzip.open(self._path(key), "rt", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, params, text):
+        """Store a response and record the delivery days it covers"""
+        key = cache_key(params)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._index[key] = {field: params[field] for field in CACHE_KEY_FIELDS}
+            self._index[key]["fetched_at"] = time.time()
+            self._save_index()
+
+    def plan(self, params, start, end):
+        """Split start..end into cached responses and missing windows.
+
+        Returns (documents, missing) where documents are cached response texts
+        covering some of the requested days and missing is a list of
+        (periodStart, periodEnd) runs of consecutive uncached days.
+        """
+        query = {field: params[field] for field in CACHE_KEY_FIELDS[:3]}
+        dt_start, dt_end = _parse_period(start), _parse_period(end)
+
+        with self._lock:
+            candidates = [
+                (key, _parse_period(entry["periodStart"]), _parse_period(entry["periodEnd"]))
+                for key, entry in self._index.items()
+                if all(entry[field] == value for field, value in query.items())
+                and not self._is_expired(entry)
+            ]
+
+        used_keys = []
+        missing = []
+        day = dt_start.replace(hour=0, minute=0)
+        while day < dt_end:
+            next_day = day + timedelta(days=1)
+            covering = next((key for key, s, e in candidates if s <= max(day, dt_start)
+                             and e >= min(next_day, dt_end)), None)
+
+            if covering is None:
+                run_start = max(day, dt_start)
+                run_end = min(next_day, dt_end)
+                if missing and missing[-1][1] == run_start:
+                    missing[-1] = (missing[-1][0], run_end)
+                else:
+                    missing.append((run_start, run_end))
+            elif covering not in used_keys:
+                used_keys.append(covering)
+            day = next_day
+
+        documents = []
+        for key in used_keys:
+            text = self._read(key)
+            if text is None:
+                # Index entry without a readable file: fall back to the network
+                return [], [(start, end)]
+            documents.append(text)
+
+        missing = [(s.strftime(PERIOD_FORMAT), e.strftime(PERIOD_FORMAT)) for s, e in missing]
+        return documents, missing
+
+    def evict_expired(self):
+        """Delete entries for volatile windows whose TTL has run out"""
+        with self._lock:
+            now = time.time()
+            expired = [key for key, entry in self._index.items() if self._is_expired(entry, now)]
+            for key in expired:
+                del self._index[key]
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            if expired:
+                self._save_index()
+        return len(expired)
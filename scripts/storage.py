@@ -0,0 +1,423 @@
+"""Storage helpers for processed price data.
+
+Parquet reading and writing requires pyarrow, which is imported lazily so the
+CSV reader works without it.
+
+The partitioned dataset uses a Hive-style layout,
+
+    <root>/zone=<EIC code>/year=<YYYY>/month=<M>/*.parquet
+
+partitioned on the UTC timestamp. Rows are sorted by timestamp_utc and every
+file carries column statistics, so readers can prune both partitions and row
+groups when they only need a few days.
+
+The compact schema stores a single int64 UTC epoch column (seconds) and a
+single EUR/MWh price column (float32, or int32 scaled by price_scale). The
+timezone and price scale go into the file metadata and the usual
+timestamp/local-time/kWh columns are rebuilt on read.
+"""
+import json
+import os
+
+import pandas as pd
+
+DEFAULT_COMPRESSION = "zstd"
+# One week of 15-minute prices per row group
+DEFAULT_ROW_GROUP_SIZE = 7 * 96
+
+EPOCH_COLUMN = "timestamp_epoch"
+PRICE_COLUMN = "price"
+PRICE_SCALES = {"float32": 1, "int32": 100}
+# Key of the JSON schema description stored in Parquet file metadata
+METADATA_KEY = b"price_processor"
+
+UNIX_EPOCH = pd.Timestamp("1970-01-01", tz="UTC")
+
+# Rows read at a time from CSV outputs
+CSV_CHUNK_ROWS = 100_000
+
+
+def compact_metadata(timezone, price_dtype="float32"):
+    return {"schema": "compact", "timezone": timezone, "price_unit": "EUR/MWh",
+            "price_scale": PRICE_SCALES[price_dtype]}
+
+
+def to_compact(df, price_dtype="float32"):
+    """Reduce a processed frame to the epoch + price columns"""
+    epoch = (df["timestamp_utc"] - UNIX_EPOCH) // pd.Timedelta(seconds=1)
+    price = df["price_EUR_MWh"].to_numpy()
+    if price_dtype == "int32":
+        price = (price * PRICE_SCALES["int32"]).round().astype("int32")
+    else:
+        price = price.astype(price_dtype)
+    return pd.DataFrame({EPOCH_COLUMN: epoch.astype("int64").to_numpy(), PRICE_COLUMN: price})
+
+
+def from_compact(df, timezone, price_scale=1, columns=None):
+    """Rebuild the requested full-schema columns from a compact frame"""
+    columns = columns or ["timestamp", "price_EUR_MWh", "price_EUR_kWh",
+                          "timestamp_utc", "timestamp_local"]
+    utc = pd.to_datetime(df[EPOCH_COLUMN].to_numpy(), unit="s", utc=True)
+    prices = df[PRICE_COLUMN].to_numpy(dtype="float64") / price_scale
+
+    views = {
+        "timestamp": lambda: utc,
+        "timestamp_utc": lambda: utc,
+        "timestamp_local": lambda: utc.tz_convert(timezone),
+        "price_EUR_MWh": lambda: prices,
+        "price_EUR_kWh": lambda: prices / 1000,
+    }
+    return pd.DataFrame({column: views[column]() for column in columns if column in views})
+
+
+def utc_timestamps(df):
+    """timestamp_utc of a frame in either schema"""
+    if EPOCH_COLUMN in df.columns:
+        return pd.Series(pd.to_datetime(df[EPOCH_COLUMN].to_numpy(), unit="s", utc=True),
+                         index=df.index)
+    return df["timestamp_utc"]
+
+
+def write_parquet(df, path, compression=DEFAULT_COMPRESSION, row_group_size=None,
+                  metadata=None):
+    """Write df with column statistics and optional JSON schema metadata"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if metadata is not None:
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), METADATA_KEY: json.dumps(metadata).encode()})
+
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path, compression=compression,
+                   row_group_size=row_group_size, write_statistics=True)
+    os.replace(tmp_path, path)
+
+
+def _statistics_timestamp(value, is_epoch):
+    if is_epoch:
+        return pd.Timestamp(value, unit="s", tz="UTC")
+    value = pd.Timestamp(value)
+    return value.tz_localize("UTC") if value.tz is None else value.tz_convert("UTC")
+
+
+def footer_range(path):
+    """Row count and first/last timestamp_utc of a Parquet file, from its footer"""
+    import pyarrow.parquet as pq
+
+    # Row-group statistics give the range without reading any data pages
+    metadata = pq.ParquetFile(path).metadata
+    schema = metadata.schema.to_arrow_schema()
+    is_epoch = EPOCH_COLUMN in schema.names
+    column = schema.get_field_index(EPOCH_COLUMN if is_epoch else "timestamp_utc")
+    first = last = None
+    for i in range(metadata.num_row_groups if column >= 0 else 0):
+        stats = metadata.row_group(i).column(column).statistics
+        if stats is None or not stats.has_min_max:
+            continue
+        low = _statistics_timestamp(stats.min, is_epoch)
+        high = _statistics_timestamp(stats.max, is_epoch)
+        first = low if first is None else min(first, low)
+        last = high if last is None else max(last, high)
+    return metadata.num_rows, first, last
+
+
+def last_timestamp(paths):
+    """Newest timestamp_utc in the given Parquet files, from row-group statistics"""
+    last = None
+    for path in paths:
+        value = footer_range(path)[2]
+        if value is not None:
+            last = value if last is None else max(last, value)
+    return last
+
+
+def _partition_values(path, key):
+    prefix = key + "="
+    if not os.path.isdir(path):
+        return []
+    return sorted(int(name[len(prefix):]) for name in os.listdir(path) if name.startswith(prefix))
+
+
+def _parquet_files(path):
+    return sorted(os.path.join(path, name) for name in os.listdir(path)
+                  if name.endswith(".parquet"))
+
+
+def zone_dir(root, zone):
+    return os.path.join(root, f"zone={zone}")
+
+
+def partition_dir(root, zone, year, month):
+    return os.path.join(zone_dir(root, zone), f"year={year}", f"month={month}")
+
+
+def latest_partition_files(root, zone):
+    """Files of the newest year/month partition of a zone"""
+    years = _partition_values(zone_dir(root, zone), "year")
+    if not years:
+        return []
+    year_dir = os.path.join(zone_dir(root, zone), f"year={years[-1]}")
+    months = _partition_values(year_dir, "month")
+    if not months:
+        return []
+    return _parquet_files(partition_dir(root, zone, years[-1], months[-1]))
+
+
+def partition_key(year, month):
+    return f"{year}-{month:02d}"
+
+
+def partition_keys(df):
+    """Keys ("YYYY-MM") of the year/month partitions df's rows belong to"""
+    utc = df["timestamp_utc"].dt.tz_convert("UTC")
+    return sorted({partition_key(year, month) for year, month in zip(utc.dt.year, utc.dt.month)})
+
+
+def partition_summaries(root, zone, keys=None):
+    """Row count and first/last timestamp_utc of each of a zone's partitions.
+
+    Read from the Parquet footers only. keys limits the scan to those
+    partitions; partitions without files are left out.
+    """
+    if keys is None:
+        years = _partition_values(zone_dir(root, zone), "year")
+        keys = [partition_key(year, month) for year in years
+                for month in _partition_values(os.path.join(zone_dir(root, zone), f"year={year}"), "month")]
+
+    summaries = {}
+    for key in keys:
+        year, month = (int(value) for value in key.split("-"))
+        path = partition_dir(root, zone, year, month)
+        files = _parquet_files(path) if os.path.isdir(path) else []
+        rows, first, last = 0, None, None
+        for file_rows, file_first, file_last in map(footer_range, files):
+            rows += file_rows
+            if file_first is not None:
+                first = file_first if first is None else min(first, file_first)
+                last = file_last if last is None else max(last, file_last)
+        if rows and first is not None:
+            summaries[key] = {"rows": rows, "first": first.strftime("%Y%m%d%H%M"),
+                              "last": last.strftime("%Y%m%d%H%M")}
+    return summaries
+
+
+def write_partitioned_dataset(df, zone, root, compression=DEFAULT_COMPRESSION,
+                              row_group_size=DEFAULT_ROW_GROUP_SIZE, append=False,
+                              compact_dtype=None, metadata=None):
+    """Write df into the zone's year/month partitions and return the files written.
+
+    With append=True each touched partition gets one new part file and
+    existing files are left alone. Otherwise each touched partition is
+    rewritten with the new rows replacing any stored rows in the same range.
+    compact_dtype stores the partitions in the compact schema.
+    """
+    import pyarrow.parquet as pq
+
+    df = df.sort_values("timestamp_utc")
+    utc = df["timestamp_utc"].dt.tz_convert("UTC")
+
+    written = []
+    for (year, month), part in df.groupby([utc.dt.year, utc.dt.month], sort=True):
+        path = partition_dir(root, zone, year, month)
+        os.makedirs(path, exist_ok=True)
+        existing = _parquet_files(path)
+
+        part_utc = part["timestamp_utc"]
+        if compact_dtype:
+            part = to_compact(part, compact_dtype)
+
+        if not append and existing:
+            stored = pq.read_table(existing).to_pandas()
+            stored_utc = utc_timestamps(stored)
+            outside = (stored_utc < part_utc.iloc[0]) | (stored_utc > part_utc.iloc[-1])
+            part = pd.concat([stored[outside], part], ignore_index=True)
+            part_utc = utc_timestamps(part)
+            order = part_utc.argsort()
+            part, part_utc = part.iloc[order], part_utc.iloc[order]
+
+        first = part_utc.iloc[0].strftime("%Y%m%d%H%M")
+        last = part_utc.iloc[-1].strftime("%Y%m%d%H%M")
+        out_file = os.path.join(path, f"part-{first}-{last}.parquet")
+        write_parquet(part, out_file, compression, row_group_size, metadata)
+        written.append(out_file)
+
+        if not append:
+            for old_file in existing:
+                if old_file != out_file:
+                    os.remove(old_file)
+
+    return written
+
+
+def _utc_timestamp(value):
+    value = pd.Timestamp(value)
+    return value.tz_localize("UTC") if value.tz is None else value.tz_convert("UTC")
+
+
+def _time_filter(start, end, partitioned, compact):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    if compact:
+        field = ds.field(EPOCH_COLUMN)
+        bound = lambda value: pa.scalar((value - UNIX_EPOCH) // pd.Timedelta(seconds=1),
+                                        type=pa.int64())
+    else:
+        field = ds.field("timestamp_utc")
+        bound = lambda value: pa.scalar(value, type=pa.timestamp("ns", tz="UTC"))
+
+    expression = None
+    if start is not None:
+        expression = field >= bound(start)
+        if partitioned:
+            # Explicit partition predicates let the dataset skip whole directories
+            year, month = ds.field("year"), ds.field("month")
+            expression &= (year > start.year) | ((year == start.year) & (month >= start.month))
+    if end is not None:
+        before_end = field < bound(end)
+        if partitioned:
+            year, month = ds.field("year"), ds.field("month")
+            before_end &= (year < end.year) | ((year == end.year) & (month <= end.month))
+        expression = before_end if expression is None else expression & before_end
+    return expression
+
+
+def _load_parquet(source, start, end, columns, partitioned, metadata_file):
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(source, format="parquet",
+                         partitioning="hive" if partitioned else None)
+    names = dataset.schema.names
+    compact = EPOCH_COLUMN in names
+    time_filter = _time_filter(start, end, partitioned, compact)
+
+    if compact:
+        table = dataset.to_table(columns=[EPOCH_COLUMN, PRICE_COLUMN], filter=time_filter)
+        stored = (dataset.schema.metadata or {}).get(METADATA_KEY)
+        metadata = json.loads(stored) if stored else _read_metadata(metadata_file)
+        return from_compact(table.to_pandas(), metadata.get("timezone", "UTC"),
+                            metadata.get("price_scale", 1), columns)
+
+    if columns is None:
+        # Partition keys are part of the layout, not of the stored data
+        columns = [name for name in names if name not in ("year", "month")]
+    else:
+        columns = [column for column in columns if column in names]
+    return dataset.to_table(columns=columns, filter=time_filter).to_pandas()
+
+
+def _read_sorted_csv(path, parse_time, low, high, **read_options):
+    # Rows are stored in timestamp order, so chunks are filtered as they are
+    # read and reading stops at the first chunk that reaches high.
+    # parse_time(chunk) returns the chunk and its times, comparable with
+    # low and high.
+    frames = []
+    for chunk in pd.read_csv(path, chunksize=CSV_CHUNK_ROWS, **read_options):
+        chunk, times = parse_time(chunk)
+        inside = pd.Series(True, index=chunk.index)
+        if low is not None:
+            inside &= times >= low
+        if high is not None:
+            inside &= times < high
+        frames.append(chunk[inside])
+        if high is not None and len(times) and times.iloc[-1] >= high:
+            break
+    if not frames:
+        return parse_time(pd.read_csv(path, nrows=0, **read_options))[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _epoch_seconds(value):
+    return None if value is None else (value - UNIX_EPOCH) // pd.Timedelta(seconds=1)
+
+
+def _parse_utc(chunk):
+    chunk["timestamp_utc"] = pd.to_datetime(chunk["timestamp_utc"], utc=True, format="ISO8601")
+    return chunk, chunk["timestamp_utc"]
+
+
+def _load_csv(path, start, end, columns, metadata_file):
+    # CSV has no row index: rows are read from the top of the file up to end.
+    # Only one timestamp column is parsed; the other timestamp columns are
+    # derived from it with vectorized tz conversions.
+    header = pd.read_csv(path, nrows=0).columns
+    metadata = _read_metadata(metadata_file)
+    timezone = metadata.get("timezone", "UTC")
+
+    if EPOCH_COLUMN in header:
+        df = _read_sorted_csv(path, lambda chunk: (chunk, chunk[EPOCH_COLUMN]),
+                              _epoch_seconds(start), _epoch_seconds(end),
+                              usecols=[EPOCH_COLUMN, PRICE_COLUMN], dtype={EPOCH_COLUMN: "int64"})
+        return from_compact(df, timezone, metadata.get("price_scale", 1), columns)
+
+    derived = {"timestamp", "timestamp_local"}
+    wanted = list(header) if columns is None else list(columns)
+    usecols = [c for c in header if c in wanted and c not in derived] + ["timestamp_utc"]
+
+    df = _read_sorted_csv(path, _parse_utc, start, end, usecols=list(dict.fromkeys(usecols)))
+
+    if "timestamp" in wanted and "timestamp" in header:
+        df["timestamp"] = df["timestamp_utc"]
+    if "timestamp_local" in wanted and "timestamp_local" in header:
+        df["timestamp_local"] = df["timestamp_utc"].dt.tz_convert(timezone)
+    return df[[column for column in header if column in df.columns]]
+
+
+def _read_metadata(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_prices(zone, start=None, end=None, columns=None, data_dir="data", export_format=None):
+    """Load stored prices for a zone (EIC code) in the UTC window [start, end).
+
+    Reads the files save_outputs wrote in export_format ("csv", "parquet" or
+    "parquet_dataset"). Parquet reads only the requested columns and prunes
+    partitions and row groups outside the window; CSV is read from the top up
+    to end and filtered in chunks. By default
+    the format recorded in the zone's metadata is used, so files left behind
+    by an earlier format are ignored; without metadata the partitioned
+    dataset, then Parquet files, then CSV are tried. Timestamp columns come
+    back as tz-aware datetimes; for the compact schema the requested
+    full-schema columns are rebuilt from the epoch and price columns.
+    """
+    start = None if start is None else _utc_timestamp(start)
+    end = None if end is None else _utc_timestamp(end)
+
+    partition_root = zone_dir(os.path.join(data_dir, "prices_dataset"), zone)
+    parquet_file = os.path.join(data_dir, f"{zone}_prices.parquet")
+    parts_dir = os.path.join(data_dir, f"{zone}_prices")
+    csv_file = os.path.join(data_dir, f"{zone}_prices.csv")
+
+    metadata_file = os.path.join(data_dir, f"{zone}_metadata.json")
+    export_format = export_format or _read_metadata(metadata_file).get("export_format")
+    if export_format is None:
+        if os.path.isdir(partition_root):
+            export_format = "parquet_dataset"
+        elif os.path.exists(parquet_file) or os.path.isdir(parts_dir):
+            export_format = "parquet"
+        else:
+            export_format = "csv"
+
+    if export_format == "parquet_dataset" and os.path.isdir(partition_root):
+        df = _load_parquet(partition_root, start, end, columns, True, metadata_file)
+    elif export_format == "parquet" and (os.path.exists(parquet_file) or os.path.isdir(parts_dir)):
+        paths = _parquet_files(parts_dir) if os.path.isdir(parts_dir) else []
+        if os.path.exists(parquet_file):
+            paths.append(parquet_file)
+        df = _load_parquet(paths, start, end, columns, False, metadata_file)
+    elif export_format == "csv" and os.path.exists(csv_file):
+        df = _load_csv(csv_file, start, end, columns, metadata_file)
+    else:
+        raise FileNotFoundError(f"No stored {export_format} prices for zone {zone} in {data_dir}")
+
+    if "timestamp_utc" in df.columns:
+        df = df.sort_values("timestamp_utc")
+    if columns is not None:
+        df = df[[column for column in columns if column in df.columns]]
+    return df.reset_index(drop=True)
@@ -0,0 +1,99 @@
+"""Synthetic ENTSO-E documents for offline benchmarks and load tests.
+
+Generates A44 day-ahead Publication_MarketDocument XML with one TimeSeries
+per delivery day, at any resolution and for curve types A01 (every point
+present) and A03 (points omitted while the price repeats), plus the
+Acknowledgement document the platform returns when there is no data.
+Prices are seeded from the zone and day, so repeated requests for the same
+window return the same document.
+"""
+import zlib
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+PUBLICATION_NAMESPACE = "urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:3"
+ACKNOWLEDGEMENT_NAMESPACE = "urn:iec62325.351:tc57wg16:451-1:acknowledgementdocument:7:0"
+PERIOD_FORMAT = "%Y%m%d%H%M"
+XML_TIME_FORMAT = "%Y-%m-%dT%H:%MZ"
+
+
+def _as_datetime(value):
+    return datetime.strptime(value, PERIOD_FORMAT) if isinstance(value, str) else value
+
+
+def day_prices(zone, day, resolution=60, repeat_ratio=0.0):
+    """Prices in €/MWh for one day: a daily double peak plus seeded noise.
+
+    A repeat_ratio share of the points repeats the previous price, which is
+    what curve type A03 leaves out of the document.
+    """
+    slots = 1440 // resolution
+    rng = np.random.default_rng(zlib.crc32(f"{zone}/{day:%Y%m%d}/{resolution}".encode()))
+    hours = np.arange(slots) * resolution / 60
+    shape = 60 + 35 * np.exp(-((hours - 8) / 2.5) ** 2) + 50 * np.exp(-((hours - 19) / 2.5) ** 2)
+    prices = np.round(shape + rng.normal(0, 12, slots), 2)
+
+    if repeat_ratio > 0:
+        repeated = rng.random(slots) < repeat_ratio
+        repeated[0] = False
+        prices = prices[np.maximum.accumulate(np.where(repeated, 0, np.arange(slots)))]
+    return prices
+
+
+def a44_document(zone, start, end, resolution=60, curve_type="A01", repeat_ratio=None):
+    """A44 document covering start..end (ENTSO-E period strings or datetimes)"""
+    dt_start, dt_end = _as_datetime(start), _as_datetime(end)
+    if repeat_ratio is None:
+        repeat_ratio = 0.2 if curve_type == "A03" else 0.0
+
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<Publication_MarketDocument xmlns="{PUBLICATION_NAMESPACE}">',
+        "<mRID>synthetic</mRID><revisionNumber>1</revisionNumber><type>A44</type>",
+        f"<createdDateTime>{datetime.now(timezone.utc):%Y-%m-%dT%H:%M:%SZ}</createdDateTime>",
+        "<period.timeInterval>",
+        f"<start>{dt_start:{XML_TIME_FORMAT}}</start><end>{dt_end:{XML_TIME_FORMAT}}</end>",
+        "</period.timeInterval>",
+    ]
+
+    day = dt_start
+    series = 1
+    while day < dt_end:
+        day_end = min(day + timedelta(days=1), dt_end)
+        slots = int((day_end - day).total_seconds() // 60 // resolution)
+        prices = day_prices(zone, day, resolution, repeat_ratio)[:slots]
+        positions = np.arange(1, slots + 1)
+        if curve_type == "A03":
+            keep = np.concatenate([[True], prices[1:] != prices[:-1]])
+            positions, prices = positions[keep], prices[keep]
+
+        parts.append(
+            f"<TimeSeries><mRID>{series}</mRID><businessType>A62</businessType>"
+            f"<in_Domain.mRID codingScheme=\"A01\">{zone}</in_Domain.mRID>"
+            f"<out_Domain.mRID codingScheme=\"A01\">{zone}</out_Domain.mRID>"
+            "<currency_Unit.name>EUR</currency_Unit.name>"
+            "<price_Measure_Unit.name>MWH</price_Measure_Unit.name>"
+            f"<curveType>{curve_type}</curveType>"
+            f"<Period><timeInterval><start>{day:{XML_TIME_FORMAT}}</start>"
+            f"<end>{day_end:{XML_TIME_FORMAT}}</end></timeInterval>"
+            f"<resolution>PT{resolution}M</resolution>")
+        parts.extend(f"<Point><position>{position}</position><price.amount>{price:.2f}</price.amount></Point>"
+                     for position, price in zip(positions.tolist(), prices.tolist()))
+        parts.append("</Period></TimeSeries>")
+        day = day_end
+        series += 1
+
+    parts.append("</Publication_MarketDocument>")
+    return "".join(parts)
+
+
+def acknowledgement_document(reason="No matching data found for Data item Day-ahead Prices"):
+    """The document returned with HTTP 200 when a query has no data"""
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<Acknowledgement_MarketDocument xmlns="{ACKNOWLEDGEMENT_NAMESPACE}">'
+        "<mRID>synthetic</mRID>"
+        f"<createdDateTime>{datetime.now(timezone.utc):%Y-%m-%dT%H:%M:%SZ}</createdDateTime>"
+        f"<Reason><code>999</code><text>{reason}</text></Reason>"
+        "</Acknowledgement_MarketDocument>")